@@ -0,0 +1,55 @@
+"""Composite indexes for the hot query paths
+
+Adds indexes matching the filter + sort shapes used by get_paginated_tasks,
+get_paginated_lists, search_tasks_and_lists and get_user_analytics. The
+indexes are built CONCURRENTLY so the upgrade can run against a live
+database without locking writes on the tasks table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_tasks_list_id_created_at', 'tasks', ['list_id', 'created_at', 'id'], None),
+    ('ix_tasks_list_id_is_completed_created_at', 'tasks', ['list_id', 'is_completed', 'created_at', 'id'], None),
+    ('ix_tasks_list_id_due_date', 'tasks', ['list_id', 'due_date', 'id'], None),
+    ('ix_tasks_list_id_priority', 'tasks', ['list_id', 'priority'], None),
+    ('ix_tasks_list_id_completed_at', 'tasks', ['list_id', 'completed_at'], sa.text('is_completed = true')),
+    ('ix_tasks_category_id', 'tasks', ['category_id'], None),
+    ('ix_todo_lists_owner_id_created_at', 'todo_lists', ['owner_id', 'created_at', 'id'], None),
+    ('ix_categories_user_id_name', 'categories', ['user_id', 'name'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,46 @@
+"""Denormalized task counters on todo_lists
+
+Adds task_count / completed_task_count, maintained by the task write paths,
+and backfills them from the tasks table. Existing rows can be re-checked at
+any time with `python -m scripts.reconcile_counters`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('todo_lists', sa.Column('task_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('todo_lists', sa.Column('completed_task_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE todo_lists
+        SET task_count = counts.total,
+            completed_task_count = counts.completed
+        FROM (
+            SELECT list_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE is_completed) AS completed
+            FROM tasks
+            GROUP BY list_id
+        ) AS counts
+        WHERE todo_lists.id = counts.list_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('todo_lists', 'completed_task_count')
+    op.drop_column('todo_lists', 'task_count')
@@ -0,0 +1,90 @@
+"""Full-text and trigram search indexes
+
+Adds stored generated tsvector columns to tasks (title, description, tags)
+and todo_lists (name, description) with GIN indexes, plus pg_trgm GIN
+indexes on tasks.title and todo_lists.name for substring matches.
+
+Adding a stored generated column rewrites the table, so schedule this
+revision for a quiet window on large databases. The indexes themselves are
+built CONCURRENTLY afterwards.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TAGS_TEXT_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_tags_text(tags text[]) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT array_to_string(tags, ' ') $$
+"""
+
+TASK_SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(task_tags_text(tags), '')), 'C')"
+)
+
+LIST_SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(TAGS_TEXT_FUNCTION)
+
+    op.add_column('tasks', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(TASK_SEARCH_VECTOR_EXPRESSION, persisted=True)
+    ))
+    op.add_column('todo_lists', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(LIST_SEARCH_VECTOR_EXPRESSION, persisted=True)
+    ))
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_search_vector', 'tasks', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_tasks_title_trgm', 'tasks', ['title'],
+            postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_todo_lists_search_vector', 'todo_lists', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_todo_lists_name_trgm', 'todo_lists', ['name'],
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todo_lists_name_trgm', table_name='todo_lists', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_todo_lists_search_vector', table_name='todo_lists', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_title_trgm', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('todo_lists', 'search_vector')
+    op.drop_column('tasks', 'search_vector')
+    op.execute("DROP FUNCTION IF EXISTS task_tags_text(text[])")
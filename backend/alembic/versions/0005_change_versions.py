@@ -0,0 +1,34 @@
+"""Change versions for conditional GETs
+
+Adds todo_lists.version (bumped by every write to a list or its tasks) and
+users.data_version (bumped by writes to the user's lists and categories).
+The ETags of the list, task and category reads are derived from them.
+
+Adding a column with a constant default does not rewrite the table.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('todo_lists', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'data_version')
+    op.drop_column('todo_lists', 'version')
@@ -0,0 +1,222 @@
+"""Native uuid primary and foreign keys
+
+Converts users.id, categories.id/user_id, todo_lists.id/owner_id and
+tasks.id/list_id/category_id from varchar to uuid without a table rewrite
+under lock:
+
+1. Add a shadow <column>_uuid column next to each key and a trigger that
+   fills it on insert and on updates of the key.
+2. Backfill existing rows in short batches by primary key, one transaction
+   per batch.
+3. Build the primary keys and the indexes over the shadow columns
+   CONCURRENTLY, and prove NOT NULL with validated CHECK constraints.
+4. Swap in one short transaction: drop the foreign keys and the varchar
+   columns, rename the shadow columns, attach the primary keys and indexes,
+   re-add the foreign keys NOT VALID. The four tables are locked up front;
+   an attempt gives up after SWAP_LOCK_TIMEOUT rather than stall traffic
+   queued behind it, and is retried.
+5. Validate the foreign keys, which does not block writes.
+
+Deploy the application release with native uuid keys (app.ids.UUIDString)
+before running this revision: its statements work against both column
+types, so it keeps serving throughout. Statements asyncpg prepared against
+the varchar columns fail after the swap, though: while this revision runs,
+give the workers prepared_statement_cache_size=0 in ASYNC_DATABASE_URL, or
+restart them right after it. The steps before the swap are safe to re-run if the
+upgrade is interrupted; an interrupted CONCURRENTLY build leaves an INVALID
+index, drop it before re-running.
+
+The downgrade converts the columns back with ALTER COLUMN TYPE, which
+rewrites the tables under lock.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Key columns per table; the primary key "id" first
+COLUMNS = [
+    ('users', ['id']),
+    ('categories', ['id', 'user_id']),
+    ('todo_lists', ['id', 'owner_id']),
+    ('tasks', ['id', 'list_id', 'category_id']),
+]
+NULLABLE = {('tasks', 'category_id')}
+
+FOREIGN_KEYS = [
+    ('categories_user_id_fkey', 'categories', 'user_id', 'users'),
+    ('todo_lists_owner_id_fkey', 'todo_lists', 'owner_id', 'users'),
+    ('tasks_list_id_fkey', 'tasks', 'list_id', 'todo_lists'),
+    ('tasks_category_id_fkey', 'tasks', 'category_id', 'categories'),
+]
+
+# Indexes over key columns, rebuilt on the shadow columns as <name>_uuid
+INDEXES = [
+    ('ix_categories_user_id_name', 'categories', ['user_id', 'name'], None),
+    ('ix_todo_lists_owner_id_created_at', 'todo_lists', ['owner_id', 'created_at', 'id'], None),
+    ('ix_tasks_list_id_created_at', 'tasks', ['list_id', 'created_at', 'id'], None),
+    ('ix_tasks_list_id_is_completed_created_at', 'tasks', ['list_id', 'is_completed', 'created_at', 'id'], None),
+    ('ix_tasks_list_id_due_date', 'tasks', ['list_id', 'due_date', 'id'], None),
+    ('ix_tasks_list_id_priority', 'tasks', ['list_id', 'priority'], None),
+    ('ix_tasks_list_id_completed_at', 'tasks', ['list_id', 'completed_at'], sa.text('is_completed = true')),
+    ('ix_tasks_category_id', 'tasks', ['category_id'], None),
+]
+
+BACKFILL_BATCH_SIZE = 10000
+SWAP_LOCK_TIMEOUT = '2s'
+SWAP_LOCK_ATTEMPTS = 30
+
+
+def shadow(column: str) -> str:
+    return f'{column}_uuid'
+
+
+def key_columns(table: str) -> list:
+    return dict(COLUMNS)[table]
+
+
+def add_shadow_columns(table: str, columns: list) -> None:
+    for column in columns:
+        op.execute(f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {shadow(column)} uuid')
+
+    assignments = ' '.join(f'NEW.{shadow(column)} := NEW.{column}::uuid;' for column in columns)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {table}_sync_uuid() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            {assignments}
+            RETURN NEW;
+        END $$
+    """)
+    op.execute(f'DROP TRIGGER IF EXISTS {table}_sync_uuid ON {table}')
+    op.execute(f"""
+        CREATE TRIGGER {table}_sync_uuid
+        BEFORE INSERT OR UPDATE OF {', '.join(columns)} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_sync_uuid()
+    """)
+
+
+def backfill(table: str, columns: list) -> None:
+    """Fill the shadow columns of existing rows, in primary key order"""
+    connection = op.get_bind()
+    assignments = ', '.join(f'{shadow(column)} = {table}.{column}::uuid' for column in columns)
+    statement = sa.text(f"""
+        WITH batch AS (
+            SELECT id FROM {table} WHERE id > :after ORDER BY id LIMIT :size
+        )
+        UPDATE {table} SET {assignments}
+        FROM batch WHERE {table}.id = batch.id
+        RETURNING {table}.id
+    """)
+    after = ''
+    while True:
+        ids = connection.execute(statement, {'after': after, 'size': BACKFILL_BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        after = max(ids)
+
+
+def lock_tables() -> None:
+    """Lock every table of the swap, backing off while traffic holds them"""
+    connection = op.get_bind()
+    tables = ', '.join(table for table, _ in COLUMNS)
+    op.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+    for attempt in range(1, SWAP_LOCK_ATTEMPTS + 1):
+        # Locks taken in a savepoint are released when it rolls back
+        savepoint = connection.begin_nested()
+        try:
+            connection.execute(sa.text(f'LOCK TABLE {tables} IN ACCESS EXCLUSIVE MODE'))
+        except sa.exc.OperationalError:
+            savepoint.rollback()
+            if attempt == SWAP_LOCK_ATTEMPTS:
+                raise
+            time.sleep(1)
+        else:
+            savepoint.commit()
+            return
+
+
+def upgrade() -> None:
+    lock_tables()
+    for table, columns in COLUMNS:
+        add_shadow_columns(table, columns)
+
+    # Each statement commits on its own: short backfill transactions, and
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table, columns in COLUMNS:
+            backfill(table, columns)
+
+        for table, _ in COLUMNS:
+            op.create_index(
+                f'{table}_id_uuid_key', table, [shadow('id')],
+                unique=True, postgresql_concurrently=True, if_not_exists=True,
+            )
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                shadow(name), table,
+                [shadow(column) if column in key_columns(table) else column for column in columns],
+                postgresql_concurrently=True, postgresql_where=where, if_not_exists=True,
+            )
+
+        # A validated CHECK lets SET NOT NULL skip its table scan in the swap
+        for table, columns in COLUMNS:
+            for column in columns:
+                if (table, column) in NULLABLE:
+                    continue
+                constraint = f'{table}_{shadow(column)}_not_null'
+                op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}')
+                op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({shadow(column)} IS NOT NULL) NOT VALID')
+                op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+
+    # The swap: catalog changes only, in one transaction
+    lock_tables()
+    for name, table, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, columns in COLUMNS:
+        op.execute(f'DROP TRIGGER {table}_sync_uuid ON {table}')
+        op.execute(f'DROP FUNCTION {table}_sync_uuid()')
+        for column in columns:
+            # Drops the varchar primary key and indexes along with the column
+            op.drop_column(table, column)
+            op.alter_column(table, shadow(column), new_column_name=column)
+            if (table, column) not in NULLABLE:
+                op.alter_column(table, column, nullable=False)
+                op.drop_constraint(f'{table}_{shadow(column)}_not_null', table, type_='check')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY USING INDEX {table}_id_uuid_key')
+    for name, table, _, _ in INDEXES:
+        op.execute(f'ALTER INDEX {shadow(name)} RENAME TO {name}')
+    for name, table, column, referenced in FOREIGN_KEYS:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {referenced} (id) NOT VALID')
+
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {name}')
+        op.execute('ANALYZE users, categories, todo_lists, tasks')
+
+
+def downgrade() -> None:
+    for name, table, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, columns in COLUMNS:
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.String(), existing_type=sa.Uuid(), postgresql_using=f'{column}::text',
+            )
+    for name, table, column, referenced in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referenced, [column], ['id'])
@@ -1,24 +1,28 @@
+import time
 from datetime import datetime, timedelta
+from itertools import chain
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.cache import TTLCache
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.hashing import HashingBusy, pwd_context, verify_and_update_password
 from app.models.user import User
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT token security
 security = HTTPBearer()
 
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+# Decoded token payloads keyed by token, and user rows keyed by id. Cached users
+# are detached snapshots: read their attributes, but load the row into the
+# request's session before changing it.
+token_cache = TTLCache("auth_tokens", settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+user_cache = TTLCache("auth_users", settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
 
 
 def get_password_hash(password: str) -> str:
@@ -57,39 +61,181 @@ def verify_token(token: str) -> Optional[dict]:
         return None
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
-    credentials_exception = HTTPException(
+def verify_token_cached(token: str) -> Optional[dict]:
+    """verify_token with decoded payloads cached until the token expires"""
+    if not settings.auth_cache_enabled:
+        return verify_token(token)
+
+    payload = token_cache.get(token)
+    if payload is not None:
+        # Cache entries never outlive the token, but check exp for clock edges
+        if payload.get("exp", 0) > time.time():
+            return payload
+        token_cache.delete(token)
+        return None
+
+    payload = verify_token(token)
+    if payload is not None:
+        token_cache.set(token, payload, ttl=payload.get("exp", 0) - time.time())
+    return payload
+
+
+def _user_snapshot(user: User) -> User:
+    """Detached copy of a user's column values, safe to share between requests"""
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+
+def invalidate_user_cache(user_id: str) -> None:
+    """Drop a cached user row; call after changing users outside the ORM"""
+    user_cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    # Only after commit, so a concurrent request cannot re-cache the old row
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user_cache(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token = credentials.credentials
-    payload = verify_token(token)
 
+def _token_subject(credentials: HTTPAuthorizationCredentials) -> str:
+    payload = verify_token_cached(credentials.credentials)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    return user_id
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current authenticated user.
+
+    Returns a cached snapshot of the user row when available; it is dropped
+    whenever the user row is updated or deleted through the ORM.
+    """
+    user_id = _token_subject(credentials)
+
+    if settings.auth_cache_enabled:
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
 
     user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+    return _checked_user(user)
 
-    return user
 
+def _checked_user(user: Optional[User]) -> User:
+    """Reject missing or inactive users and cache the snapshot"""
+    if user is None or user.is_active is False:
+        raise _credentials_exception()
+
+    if not settings.auth_cache_enabled:
+        return user
+
+    snapshot = _user_snapshot(user)
+    user_cache.set(user.id, snapshot)
+    return snapshot
+
+
+def get_current_user_for_read(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Current user for read-only endpoints that only need the user id.
+
+    With AUTH_TRUST_TOKEN_CLAIMS enabled the signed token is trusted as is and
+    no user lookup happens at all; a deactivated user then keeps read access
+    until the token expires. Otherwise this is get_current_user.
+    """
+    if settings.auth_trust_token_claims:
+        return User(id=_token_subject(credentials))
+
+    return get_current_user(credentials, db)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user for async routers"""
+    user_id = _token_subject(credentials)
+
+    if settings.auth_cache_enabled:
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+
+    return _checked_user(await db.get(User, user_id))
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user with email and password"""
-    user = db.query(User).filter(User.email == email).first()
+
+async def get_current_user_for_read_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user_for_read for async routers"""
+    if settings.auth_trust_token_claims:
+        return User(id=_token_subject(credentials))
+
+    return await get_current_user_async(credentials, db)
+
+
+def _save_password_hash(db: Session, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.commit()
+    db.refresh(user)
+
+
+def hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent sign-ins, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def authenticate_user_async(db: Session, email: str, password: str) -> Optional[User]:
+    """Authenticate a user without blocking the event loop.
+
+    The lookup runs in the threadpool and bcrypt on the hashing pool. A hash
+    made with a different BCRYPT_ROUNDS is replaced on success.
+    """
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.email == email).first())
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+
+    try:
+        valid, new_hash = await verify_and_update_password(password, user.password_hash)
+    except HashingBusy:
+        raise hashing_busy_exception()
+    if not valid:
         return None
+
+    if new_hash is not None:
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
     return user
@@ -0,0 +1,139 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import update, select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.todo_list import TodoList
+from app.models.task import Task
+
+
+async def adjust_task_counts(db: AsyncSession, list_id: str, total_delta: int = 0, completed_delta: int = 0) -> None:
+    """Atomically shift a list's task counters inside the caller's transaction.
+
+    The increment is done in SQL (count = count + delta) so concurrent writers
+    never overwrite each other; the caller's commit makes it durable together
+    with the task change that caused it. Every task write goes through here,
+    so the list's change version is bumped even when both deltas are zero.
+    """
+    await db.execute(
+        update(TodoList)
+        .where(TodoList.id == list_id)
+        .values(
+            task_count=TodoList.task_count + total_delta,
+            completed_task_count=TodoList.completed_task_count + completed_delta,
+            version=TodoList.version + 1
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def adjust_task_counts_many(db: AsyncSession, deltas: Dict[str, Tuple[int, int]]) -> None:
+    """Apply (total_delta, completed_delta) pairs keyed by list id"""
+    # Update lists in a fixed order so concurrent bulk writers cannot deadlock
+    for list_id in sorted(deltas):
+        total_delta, completed_delta = deltas[list_id]
+        await adjust_task_counts(db, list_id, total_delta, completed_delta)
+
+
+async def bump_versions(db: AsyncSession, user_id: Optional[str] = None, list_ids: Iterable[str] = ()) -> None:
+    """Bump change versions inside the caller's transaction.
+
+    Lists are bumped before the user row, the same order as the task write
+    paths, so concurrent writers cannot deadlock.
+    """
+    list_ids = sorted(set(list_ids))
+    if list_ids:
+        await db.execute(
+            update(TodoList)
+            .where(TodoList.id.in_(list_ids))
+            .values(version=TodoList.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    if user_id is not None:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            # Keep updated_at about the profile, not about the user's data
+            .values(data_version=User.data_version + 1, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def task_count_deltas(tasks: Iterable[Task], sign: int = 1) -> Dict[str, Tuple[int, int]]:
+    """Per-list counter deltas for adding (sign=1) or removing (sign=-1) tasks"""
+    deltas = defaultdict(lambda: [0, 0])
+    for task in tasks:
+        deltas[task.list_id][0] += sign
+        if task.is_completed:
+            deltas[task.list_id][1] += sign
+    return {list_id: (total, completed) for list_id, (total, completed) in deltas.items()}
+
+
+def completion_deltas(rows: Iterable) -> Dict[str, Tuple[int, int]]:
+    """Per-list completed-counter deltas for updated rows.
+
+    Rows carry the new is_completed and the previous value as was_completed.
+    Lists with a zero delta are kept so their change versions are bumped.
+    """
+    deltas = defaultdict(int)
+    for row in rows:
+        deltas[row.list_id] += int(bool(row.is_completed)) - int(bool(row.was_completed))
+    return {list_id: (0, delta) for list_id, delta in deltas.items()}
+
+
+def reconcile_task_counts(db: Session, batch_size: int = 1000) -> int:
+    """Recompute drifted counters for every list, one batch per transaction.
+
+    Each batch first locks its list rows, then recounts in a separate
+    statement so the counts include every task write that committed while
+    waiting for the lock. Returns the number of lists that were corrected.
+    """
+    fixed = 0
+    last_id = None
+
+    while True:
+        # Keyset over the list ids; the first batch starts from the smallest
+        after = [TodoList.id > last_id] if last_id is not None else []
+        list_ids = db.execute(
+            select(TodoList.id)
+            .where(*after)
+            .order_by(TodoList.id)
+            .limit(batch_size)
+            .with_for_update()
+        ).scalars().all()
+
+        if not list_ids:
+            db.commit()
+            break
+
+        total = select(func.count(Task.id)).where(Task.list_id == TodoList.id).scalar_subquery()
+        completed = select(func.count(Task.id)).where(
+            Task.list_id == TodoList.id, Task.is_completed == True
+        ).scalar_subquery()
+
+        owner_ids = db.execute(
+            update(TodoList)
+            .where(
+                TodoList.id.in_(list_ids),
+                or_(TodoList.task_count != total, TodoList.completed_task_count != completed)
+            )
+            .values(task_count=total, completed_task_count=completed, version=TodoList.version + 1)
+            .returning(TodoList.owner_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        fixed += len(owner_ids)
+
+        # Corrected counters change the owners' list responses too
+        if owner_ids:
+            db.execute(
+                update(User)
+                .where(User.id.in_(sorted(set(owner_ids))))
+                .values(data_version=User.data_version + 1, updated_at=User.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+        last_id = list_ids[-1]
+
+    return fixed
@@ -1,21 +1,53 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, DDL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.metrics import instrument_engine, timed_pool
 
 # Create database engine
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
     pool_recycle=300,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    poolclass=timed_pool(QueuePool, "sync"),
 )
+instrument_engine(engine, "sync")
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    """Point a postgresql:// URL at the asyncpg driver"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Async engine for the async routers; same database, separate pool
+async_engine = create_async_engine(
+    settings.async_database_url or async_database_url(settings.database_url),
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    poolclass=timed_pool(AsyncAdaptedQueuePool, "async"),
+)
+instrument_engine(async_engine.sync_engine, "async")
+
+# Objects stay loaded after commit: an expired attribute would need a lazy
+# load, which cannot happen implicitly under asyncio. Refresh explicitly. For
+# the same reason model relationships are lazy="raise_on_sql".
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create base class for models
 Base = declarative_base()
 
+# Trigram indexes used by search need pg_trgm before any table is created
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 
 def get_db():
     """Dependency to get database session"""
@@ -26,6 +58,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_test_db():
     """Dependency to get test database session"""
     test_engine = create_engine(settings.database_test_url)
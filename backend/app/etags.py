@@ -0,0 +1,37 @@
+"""Weak ETags for conditional GETs.
+
+Tags are derived from change versions kept in the database (TodoList.version,
+User.data_version) so a matching If-None-Match can be answered with 304 after
+a single primary-key lookup, before any rows are loaded or serialized.
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+from app.config import settings
+
+
+def make_etag(request: Request, scope: str, version: int) -> str:
+    """Weak ETag for the request's path and query at a change version"""
+    shape = "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items()))
+    digest = hashlib.sha1(
+        f"{settings.app_version}|{request.url.path}?{shape}|{scope}={version}".encode()
+    ).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against the If-None-Match header"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response when the client already has this version, else None"""
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
@@ -0,0 +1,53 @@
+"""Sparse fieldsets: ?fields=id,title,is_completed.
+
+The requested fields restrict both the SELECT (load_only) and the response
+body. Listing routes leave out their heavy columns unless they are asked for;
+fields=* returns every field. "id" is always included.
+"""
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel, create_model
+from sqlalchemy.orm import load_only
+
+ALL_FIELDS = "*"
+
+
+def default_fields(model: Type[BaseModel], deferred: Iterable[str] = ()) -> Tuple[str, ...]:
+    """Every field of model except the deferred ones"""
+    return tuple(name for name in model.model_fields if name not in set(deferred))
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel], default: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Field names selected by a fields= parameter, in schema order"""
+    if fields is None:
+        return default
+    if fields.strip() == ALL_FIELDS:
+        return tuple(model.model_fields)
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    requested.add("id")
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """model restricted to names; model itself when nothing is left out"""
+    if names == tuple(model.model_fields):
+        return model
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=model.model_config,
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in names}
+    )
+
+
+def load_columns(entity, names: Iterable[str], *extra: str):
+    """load_only() option for the fields plus extra attribute names (sort keys)"""
+    return load_only(*(getattr(entity, name) for name in dict.fromkeys((*names, *extra))))
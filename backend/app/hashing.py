@@ -0,0 +1,127 @@
+"""Password hashing off the event loop and the request threadpool.
+
+bcrypt is deliberately slow, so hashes are computed in a dedicated process
+pool, sized separately from the web server's threads. Requests that would
+queue more than PASSWORD_HASH_MAX_QUEUE jobs behind the busy workers are
+rejected instead of piling up.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from app.config import settings
+
+# Pinning min/max to the configured cost makes needs_update() flag hashes made
+# with any other cost, so they are rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class HashingPool:
+    """Bounded pool of hashing workers.
+
+    With workers=0 hashes run on a small thread pool instead of separate
+    processes; bcrypt releases the GIL, but the threads still share a core
+    budget with the application.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    # spawn: forking a threaded server process is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="password-hash")
+            return self._executor
+
+    def _reserve(self) -> None:
+        with self._lock:
+            if self._pending >= max(self.workers, 1) + self.max_queue:
+                raise HashingBusy()
+            self._pending += 1
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool; raises HashingBusy when the queue is full"""
+        executor = self._get_executor()
+        self._reserve()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException as exc:
+            self._release()
+            if isinstance(exc, BrokenProcessPool):
+                self._discard(executor)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            self._discard(executor)
+            raise
+
+    def _discard(self, executor: Executor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "max_queue": self.max_queue, "pending": self._pending}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+hashing_pool = HashingPool(settings.password_hash_workers, settings.password_hash_max_queue)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await hashing_pool.run(_hash, password)
+
+
+async def verify_and_update_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the hashing pool.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash uses an
+    outdated cost and should be replaced.
+    """
+    return await hashing_pool.run(_verify_and_update, password, hashed_password)
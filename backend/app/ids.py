@@ -0,0 +1,103 @@
+"""Row identifiers.
+
+Primary and foreign keys are native uuid columns (16 bytes instead of a
+36-character varchar in every index entry and join). The application and the
+API keep handling them as canonical strings.
+
+New rows get time-ordered UUIDv7 ids (RFC 9562): the leading 48 bits are the
+Unix time in milliseconds, so rows inserted together land on the rightmost
+pages of the primary key and (list_id, ..., id) indexes instead of random ones.
+Within a process ids are strictly increasing, so rows created in one request
+(e.g. an import) sort by id in creation order even within a millisecond.
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Annotated
+from pydantic import AfterValidator
+from sqlalchemy import Text, cast
+from sqlalchemy.types import TypeDecorator, UserDefinedType
+
+_RANDOM_BITS = 74  # rand_a (12 bits) and rand_b (62 bits)
+
+# (milliseconds, random bits) of the last id issued by this process
+_last = (0, 0)
+_last_lock = threading.Lock()
+
+
+def uuid7() -> uuid.UUID:
+    """Random UUID whose first 48 bits are the current time in milliseconds.
+
+    When the clock has not moved past the previous id's millisecond, the
+    previous id's random bits are incremented instead (RFC 9562 method 2).
+    """
+    global _last
+    milliseconds = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), "big") >> (80 - _RANDOM_BITS)
+    with _last_lock:
+        if (milliseconds, random_bits) <= _last:
+            milliseconds, random_bits = _last[0], _last[1] + 1
+            if random_bits >> _RANDOM_BITS:
+                milliseconds, random_bits = milliseconds + 1, 0
+        _last = (milliseconds, random_bits)
+
+    rand_a, rand_b = random_bits >> 62, random_bits & ((1 << 62) - 1)
+    value = (milliseconds & 0xFFFF_FFFF_FFFF) << 80 | 0x7 << 76 | rand_a << 64 | 0x2 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """Primary key for a new row"""
+    return str(uuid7())
+
+
+def canonical_id(value: str) -> str:
+    """Lowercase hyphenated form of a uuid string (braces, uppercase and
+    missing hyphens are accepted). Malformed values are returned unchanged;
+    they name no row and are bound as NULL."""
+    try:
+        return str(uuid.UUID(value))
+    except (AttributeError, TypeError, ValueError):
+        return value
+
+
+# An id in a request body. Ids are compared as strings in Python (ownership
+# checks, duplicate detection), so they are normalised on the way in.
+IdString = Annotated[str, AfterValidator(canonical_id)]
+
+
+class _NativeUUID(UserDefinedType):
+    """uuid in DDL. Bound values carry no cast, so the server types them from
+    the column they are compared with or stored in."""
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "UUID"
+
+
+class UUIDString(TypeDecorator):
+    """Native uuid column holding canonical strings on the Python side.
+
+    Because parameters are not cast, statements work against both uuid and
+    the former varchar columns, which lets this code ship before the
+    migration. For the same reason the columns are selected as text: rows
+    come back as strings from either column type, which is also what the ORM
+    matches against the ids it inserted.
+
+    A malformed string cannot name any row: it is bound as NULL, so looking
+    one up finds nothing (a 404) instead of failing the statement.
+    """
+    impl = _NativeUUID
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return str(value if isinstance(value, uuid.UUID) else uuid.UUID(value))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def column_expression(self, column):
+        return cast(column, Text)
@@ -1,10 +1,16 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
+from app.cache import cache_stats
 from app.config import settings
-from app.database import engine, Base
-from app.routers import auth, users, lists, tasks, categories, search
+from app.database import engine, async_engine, Base
+from app.hashing import hashing_pool
+from app.metrics import MetricsMiddleware, metrics_response, runtime_collector
+from app.rate_limit import RateLimitMiddleware, rate_limiter
+from app.read_replicas import ReadYourWritesMiddleware, replica_router
+from app.response_cache import response_cache
+from app.routers import auth, users, lists, tasks, categories, search, export, imports
 
 # Create database tables
 @asynccontextmanager
@@ -13,7 +19,11 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     yield
     # Shutdown
-    pass
+    hashing_pool.shutdown()
+    await response_cache.close()
+    await rate_limiter.close()
+    await replica_router.close()
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -22,9 +32,16 @@ app = FastAPI(
     description="A comprehensive REST API for managing TODO lists and tasks",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Marks clients that wrote so their next reads go to the primary
+app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+
+# Rate limiting; added before CORS so rejected requests still get CORS headers
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +51,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so rate-limited and CORS-handled requests are measured too;
+# app.routes is the live list, so routers included below are matched as well
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+runtime_collector.engines.update({"sync": engine, "async": async_engine.sync_engine})
+runtime_collector.engines.update({name: replica.sync_engine for name, replica in replica_router.engines})
+runtime_collector.cache_stats += [cache_stats, lambda: {"response_cache": response_cache.stats()}]
+
 # Global exception handler
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -43,7 +67,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "error": exc.detail,
             "code": f"HTTP_{exc.status_code}",
             "details": None
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -64,11 +89,26 @@ app.include_router(lists.router, prefix="/v1")
 app.include_router(tasks.router, prefix="/v1")
 app.include_router(categories.router, prefix="/v1")
 app.include_router(search.router, prefix="/v1")
+app.include_router(export.router, prefix="/v1")
+app.include_router(imports.router, prefix="/v1")
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": settings.app_version}
+    return {
+        "status": "healthy",
+        "version": settings.app_version,
+        "caches": cache_stats(),
+        "password_hashing": hashing_pool.stats(),
+        "response_cache": response_cache.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "read_replicas": replica_router.stats(),
+    }
+
+# Prometheus metrics of this worker
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
 
 # Root endpoint
 @app.get("/")
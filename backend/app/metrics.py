@@ -0,0 +1,180 @@
+"""Prometheus metrics.
+
+Request metrics are labelled with the matched route template (for example
+/v1/lists/{list_id}), never the raw path, so label cardinality is bounded by
+the number of routes. Queries are attributed to the request that issued them
+through the request's StatementRecorder (app.sql_recorder), held in a context
+variable that also follows sync handlers into the threadpool. Values that
+only exist at scrape time (pool and threadpool usage, cache counters) are read
+by RuntimeCollector.
+
+Metrics are kept per worker process; scrape every worker.
+"""
+import time
+from typing import Callable, Dict, List
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from app.sql_recorder import StatementRecorder, current_recorder, record_statement
+
+# Label for requests that matched no route
+UNMATCHED_ROUTE = "unmatched"
+
+REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ["method", "route"])
+QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements issued per request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+)
+DB_TIME_PER_REQUEST = Histogram("db_time_per_request_seconds", "Time spent in SQL statements per request", ["route"])
+QUERY_DURATION = Histogram("db_query_duration_seconds", "SQL statement latency", ["engine"])
+REPEATED_STATEMENTS = Counter(
+    "db_repeated_statements_total", "Requests flagged for repeating a statement shape (possible N+1)", ["route"]
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting to check a connection out of the pool", ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Time every statement and record it against the current request"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        QUERY_DURATION.labels(name).observe(elapsed)
+        record_statement(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # A failed statement gets no after_cursor_execute; drop its start time
+        # so the connection does not carry it back into the pool
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def timed_pool(pool_class, name: str):
+    """pool_class subclass recording how long checkouts wait for a connection"""
+
+    class TimedPool(pool_class):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                POOL_CHECKOUT_WAIT.labels(name).observe(time.perf_counter() - started)
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
+
+
+def route_template(routes: list, scope) -> str:
+    """Path template of the route that will handle scope"""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and DB usage per route"""
+
+    def __init__(self, app, routes: list):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.routes, scope)
+        recorder = StatementRecorder(route)
+        token = current_recorder.set(recorder)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            QUERIES_PER_REQUEST.labels(route).observe(recorder.queries)
+            DB_TIME_PER_REQUEST.labels(route).observe(recorder.db_time)
+            if recorder.report_repeats():
+                REPEATED_STATEMENTS.labels(route).inc()
+            in_progress.dec()
+            current_recorder.reset(token)
+
+
+class RuntimeCollector:
+    """Connection pool, threadpool and cache figures read at scrape time"""
+
+    def __init__(self):
+        self.engines: Dict[str, Engine] = {}
+        self.cache_stats: List[Callable[[], Dict[str, dict]]] = []
+
+    def describe(self):
+        # Nothing to declare up front; keeps register() from calling collect()
+        return []
+
+    def collect(self):
+        pool = GaugeMetricFamily("db_pool_connections", "Connections by pool state", labels=["engine", "state"])
+        for name, engine in self.engines.items():
+            pool.add_metric([name, "checked_out"], engine.pool.checkedout())
+            pool.add_metric([name, "idle"], engine.pool.checkedin())
+            pool.add_metric([name, "overflow"], max(engine.pool.overflow(), 0))
+            pool.add_metric([name, "size"], engine.pool.size())
+        yield pool
+
+        # Only readable from the event loop, which is where /metrics runs
+        limiter = current_default_thread_limiter()
+        threads = GaugeMetricFamily("threadpool_threads", "Worker threads for sync handlers by state", labels=["state"])
+        threads.add_metric(["busy"], limiter.borrowed_tokens)
+        threads.add_metric(["limit"], limiter.total_tokens)
+        threads.add_metric(["waiting"], limiter.statistics().tasks_waiting)
+        yield threads
+
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Cache hits over lookups", labels=["cache"])
+        for source in self.cache_stats:
+            for name, stats in source().items():
+                hits.add_metric([name], stats["hits"])
+                misses.add_metric([name], stats["misses"])
+                ratio.add_metric([name], stats["hit_ratio"])
+        yield hits
+        yield misses
+        yield ratio
+
+
+runtime_collector = RuntimeCollector()
+REGISTRY.register(runtime_collector)
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
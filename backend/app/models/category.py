@@ -1,23 +1,27 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
-import uuid
+from app.ids import UUIDString, new_id
 
 
 class Category(Base):
     __tablename__ = "categories"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     name = Column(String, nullable=False)
     color = Column(String, default="#4CAF50")
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUIDString, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_categories_user_id_name", "user_id", "name"),
+    )
+
     # Relationships
-    user = relationship("User", back_populates="categories")
-    tasks = relationship("Task", back_populates="category")
+    user = relationship("User", back_populates="categories", lazy="raise_on_sql")
+    tasks = relationship("Task", back_populates="category", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Category(id={self.id}, name={self.name}, user_id={self.user_id})>"
@@ -1,29 +1,63 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, ARRAY
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text, Index, Computed, event, DDL
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
-import uuid
+from app.ids import UUIDString, new_id
+
+# array_to_string is only STABLE, so generated columns need an IMMUTABLE wrapper
+TAGS_TEXT_FUNCTION = """
+CREATE OR REPLACE FUNCTION task_tags_text(tags text[]) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT array_to_string(tags, ' ') $$
+"""
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(task_tags_text(tags), '')), 'C')"
+)
 
 
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     title = Column(String, nullable=False)
     description = Column(Text)
     is_completed = Column(Boolean, default=False)
     priority = Column(String, default="medium")  # low, medium, high, urgent
     due_date = Column(DateTime(timezone=True))
-    list_id = Column(String, ForeignKey("todo_lists.id"), nullable=False)
-    category_id = Column(String, ForeignKey("categories.id"))
+    list_id = Column(UUIDString, ForeignKey("todo_lists.id"), nullable=False)
+    category_id = Column(UUIDString, ForeignKey("categories.id"))
     tags = Column(ARRAY(String), default=[])
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True))
+    # Full-text document (title, description, tags); deferred so normal reads never load it
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+
+    # Composite indexes matching the filter + sort shapes of the task listing,
+    # search and analytics queries (every read is scoped by list_id first)
+    __table_args__ = (
+        Index("ix_tasks_list_id_created_at", "list_id", "created_at", "id"),
+        Index("ix_tasks_list_id_is_completed_created_at", "list_id", "is_completed", "created_at", "id"),
+        Index("ix_tasks_list_id_due_date", "list_id", "due_date", "id"),
+        Index("ix_tasks_list_id_priority", "list_id", "priority"),
+        Index("ix_tasks_list_id_completed_at", "list_id", "completed_at", postgresql_where=(is_completed == True)),
+        Index("ix_tasks_category_id", "category_id"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        # Serves the tags @> / && filters
+        Index("ix_tasks_tags", "tags", postgresql_using="gin"),
+    )
 
     # Relationships
-    list = relationship("TodoList", back_populates="tasks")
-    category = relationship("Category", back_populates="tasks")
+    list = relationship("TodoList", back_populates="tasks", lazy="raise_on_sql")
+    category = relationship("Category", back_populates="tasks", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}, list_id={self.list_id})>"
+
+
+event.listen(Task.__table__, "before_create", DDL(TAGS_TEXT_FUNCTION))
@@ -1,25 +1,44 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Integer, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
-import uuid
+from app.ids import UUIDString, new_id
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+)
 
 
 class TodoList(Base):
     __tablename__ = "todo_lists"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     name = Column(String, nullable=False)
     description = Column(String)
     color = Column(String, default="#4CAF50")
     is_shared = Column(Boolean, default=False)
-    owner_id = Column(String, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(UUIDString, ForeignKey("users.id"), nullable=False)
+    # Denormalized counters maintained by the task write paths (see app.counters)
+    task_count = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_task_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Change version for ETags; bumped by every write to the list or its tasks
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Full-text document (name, description); deferred so normal reads never load it
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+
+    __table_args__ = (
+        Index("ix_todo_lists_owner_id_created_at", "owner_id", "created_at", "id"),
+        Index("ix_todo_lists_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_todo_lists_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     # Relationships
-    owner = relationship("User", back_populates="lists")
-    tasks = relationship("Task", back_populates="list", cascade="all, delete-orphan")
+    owner = relationship("User", back_populates="lists", lazy="raise_on_sql")
+    tasks = relationship("Task", back_populates="list", cascade="all, delete-orphan", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<TodoList(id={self.id}, name={self.name}, owner_id={self.owner_id})>"
@@ -1,26 +1,28 @@
-from sqlalchemy import Column, String, DateTime, Boolean
+from sqlalchemy import Column, String, DateTime, Boolean, Integer
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
-import uuid
+from app.ids import UUIDString, new_id
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=new_id)
     email = Column(String, unique=True, index=True, nullable=False)
     username = Column(String, unique=True, index=True, nullable=False)
     password_hash = Column(String, nullable=False)
     first_name = Column(String)
     last_name = Column(String)
     is_active = Column(Boolean, default=True)
+    # Change version for ETags of the user's list and category collections
+    data_version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    lists = relationship("TodoList", back_populates="owner", cascade="all, delete-orphan")
-    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
+    lists = relationship("TodoList", back_populates="owner", cascade="all, delete-orphan", lazy="raise_on_sql")
+    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan", lazy="raise_on_sql")
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, username={self.username})>"
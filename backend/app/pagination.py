@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Select, and_, literal, or_, tuple_
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: str) -> str:
+    """Encode the sort key and id of the last row into an opaque cursor"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, sort_order, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str, sort_field) -> Tuple[Any, str]:
+    """Decode a cursor into the (sort value, id) pair to seek from"""
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+    try:
+        cursor_sort_by, cursor_sort_order, value, row_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        if value is not None and isinstance(sort_field.type, DateTime):
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError, binascii.Error):
+        raise invalid_cursor
+
+    # A cursor only makes sense for the ordering it was issued for
+    if (cursor_sort_by, cursor_sort_order) != (sort_by, sort_order):
+        raise invalid_cursor
+
+    return value, row_id
+
+
+def order_by_keyset(query: Select, sort_field, id_field, sort_order: str) -> Select:
+    """Order by the sort field with the primary key as a stable tiebreaker"""
+    if sort_order == "asc":
+        return query.order_by(sort_field.asc(), id_field.asc())
+    return query.order_by(sort_field.desc(), id_field.desc())
+
+
+def seek(query: Select, sort_field, id_field, sort_order: str, value: Any, row_id: str) -> Select:
+    """Restrict the query to rows strictly after (value, row_id) in keyset order.
+
+    Follows PostgreSQL's default NULL placement (last when ascending, first
+    when descending) so nullable sort fields such as due_date page correctly.
+    """
+    # Bind the cursor values with the column types; tuple_() does not infer them
+    key = tuple_(literal(value, sort_field.type), literal(row_id, id_field.type))
+    if sort_order == "asc":
+        if value is None:
+            condition = and_(sort_field.is_(None), id_field > row_id)
+        else:
+            condition = or_(
+                tuple_(sort_field, id_field) > key,
+                sort_field.is_(None)
+            )
+    else:
+        if value is None:
+            condition = or_(
+                sort_field.isnot(None),
+                and_(sort_field.is_(None), id_field < row_id)
+            )
+        else:
+            condition = tuple_(sort_field, id_field) < key
+
+    return query.where(condition)
+
+
+def next_cursor_for(rows: List[Any], sort_by: str, sort_order: str, sort_field) -> Optional[str]:
+    """Build the cursor pointing after the last row of a page"""
+    if not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(sort_by, sort_order, getattr(last, sort_field.key), last.id)
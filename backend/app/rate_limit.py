@@ -0,0 +1,212 @@
+"""Token-bucket rate limiting.
+
+Every client has a bucket of RATE_LIMIT_BURST tokens (RATE_LIMIT_PER_MINUTE
+by default) that refills at RATE_LIMIT_PER_MINUTE tokens a minute. Clients
+are identified by the user id in their bearer token, or by IP address for
+anonymous requests. A request takes as many tokens as its route costs
+(RATE_LIMIT_ROUTE_COSTS, longest matching path prefix, 1 otherwise) and is
+rejected with 429 when the bucket holds fewer.
+"""
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.auth import verify_token_cached
+from app.config import settings
+
+# Buckets kept by the memory backend; full buckets are the same as absent ones,
+# so evicting the least recently used loses nothing that matters
+MAX_MEMORY_BUCKETS = 100_000
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, max_buckets: int = MAX_MEMORY_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: int, rate: float, cost: int) -> Tuple[bool, float]:
+        """Take cost tokens; returns (allowed, tokens left)"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBackend:
+    """Buckets shared by every worker; updated atomically by a Lua script"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, capacity: int, rate: float, cost: int) -> Tuple[bool, float]:
+        allowed, tokens = await self.script(keys=[f"ratelimit:{key}"], args=[capacity, rate, cost])
+        return bool(allowed), float(tokens)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class RateLimiter:
+    """Token buckets per client; backend errors let requests through"""
+
+    def __init__(self, backend, per_minute: int, burst: Optional[int], route_costs: Dict[str, int]):
+        self.backend = backend
+        self.capacity = burst or per_minute
+        self.rate = per_minute / 60
+        # Longest prefixes first so the most specific route wins
+        self.route_costs = sorted(route_costs.items(), key=lambda item: len(item[0]), reverse=True)
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    def cost(self, method: str, path: str) -> int:
+        if method == "OPTIONS":
+            return 0
+        for prefix, cost in self.route_costs:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                # A cost above the bucket size could never be paid
+                return min(cost, self.capacity)
+        return 1
+
+    async def take(self, key: str, cost: int) -> Optional[Tuple[bool, float]]:
+        """(allowed, tokens left), or None when the backend is unavailable"""
+        try:
+            allowed, tokens = await self.backend.take(key, self.capacity, self.rate, cost)
+        except Exception:
+            self.errors += 1
+            return None
+        if allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return allowed, tokens
+
+    def headers(self, tokens: float, cost: int, allowed: bool) -> list:
+        headers = [
+            (b"ratelimit-limit", str(self.capacity).encode()),
+            (b"ratelimit-remaining", str(int(tokens)).encode()),
+            (b"ratelimit-reset", str(math.ceil((self.capacity - tokens) / self.rate)).encode()),
+            (b"ratelimit-policy", f"{self.capacity};w=60".encode()),
+        ]
+        if not allowed:
+            headers.append((b"retry-after", str(max(math.ceil((cost - tokens) / self.rate), 1)).encode()))
+        return headers
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors,
+        }
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def client_key(scope) -> str:
+    """user:<id> for a valid bearer token, otherwise ip:<address>"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                payload = verify_token_cached(token.strip())
+                if payload and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying the rate limiter to every HTTP request"""
+
+    def __init__(self, app, limiter: "RateLimiter"):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.limiter.backend is None:
+            await self.app(scope, receive, send)
+            return
+
+        cost = self.limiter.cost(scope["method"], scope["path"])
+        result = await self.limiter.take(client_key(scope), cost) if cost else None
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed, tokens = result
+        headers = self.limiter.headers(tokens, cost, allowed)
+
+        if not allowed:
+            body = json.dumps({"error": "Rate limit exceeded", "code": "HTTP_429", "details": None}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + headers,
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def create_backend(name: str):
+    if name == "redis":
+        return RedisBackend(settings.redis_url)
+    if name == "memory":
+        return MemoryBackend()
+    return None
+
+
+rate_limiter = RateLimiter(
+    create_backend(settings.rate_limit_backend),
+    settings.rate_limit_per_minute,
+    settings.rate_limit_burst,
+    settings.rate_limit_route_costs,
+)
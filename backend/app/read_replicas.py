@@ -0,0 +1,197 @@
+"""Routing of read-only requests to read replicas.
+
+Read-only handlers take their session from get_read_db. Without
+DATABASE_REPLICA_URLS that is an ordinary primary session. With replicas it
+is bound to one of them, picked round robin or by fewest checked-out
+connections (REPLICA_BALANCING).
+
+Replicas lag the primary, so a client that made a write (any POST, PUT, PATCH
+or DELETE) reads from the primary for READ_YOUR_WRITES_SECONDS afterwards and
+never sees its own change disappear. Keep the window above the replication
+lag you expect. Clients are identified as by the rate limiter: the user id in
+the bearer token, or the IP address.
+
+The memory backend only remembers writes served by its own process. Use the
+redis backend with several workers.
+"""
+import itertools
+from collections import Counter
+from typing import AsyncIterator, List, Tuple
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.cache import TTLCache
+from app.config import settings
+from app.database import AsyncSessionLocal, async_database_url
+from app.metrics import instrument_engine, timed_pool
+from app.rate_limit import client_key
+
+# Clients remembered by the memory backend; the oldest are dropped first
+MAX_RECENT_WRITERS = 100_000
+
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, window: int):
+        self.writers = TTLCache("recent_writes", MAX_RECENT_WRITERS, window)
+
+    async def mark(self, key: str, window: int) -> None:
+        self.writers.set(key, True, window)
+
+    async def is_marked(self, key: str) -> bool:
+        return self.writers.get(key, False)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+
+    async def mark(self, key: str, window: int) -> None:
+        await self.client.set(f"recent_write:{key}", 1, ex=window)
+
+    async def is_marked(self, key: str) -> bool:
+        return bool(await self.client.exists(f"recent_write:{key}"))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_replica_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        async_database_url(url),
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        poolclass=timed_pool(AsyncAdaptedQueuePool, name),
+    )
+    instrument_engine(engine.sync_engine, name)
+    return engine
+
+
+class ReplicaRouter:
+    """Picks the session factory for a read; the primary's when in doubt"""
+
+    def __init__(self, engines: List[Tuple[str, AsyncEngine]], balancing: str, backend, window: int):
+        self.engines = engines
+        self.sessionmakers = [
+            (name, async_sessionmaker(engine, autoflush=False, expire_on_commit=False))
+            for name, engine in engines
+        ]
+        self.balancing = balancing
+        self.backend = backend
+        self.window = window
+        self._turn = itertools.count()
+        self.reads: Counter = Counter()
+        self.writes_marked = 0
+        self.errors = 0
+
+    def pick(self) -> Tuple[str, async_sessionmaker]:
+        start = next(self._turn)
+        if self.balancing == "least_connections":
+            # Scan from a rotating start so idle replicas share the ties
+            order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+            return self.sessionmakers[min(order, key=lambda index: self.engines[index][1].pool.checkedout())]
+        return self.sessionmakers[start % len(self.sessionmakers)]
+
+    async def sessionmaker_for(self, key: str) -> async_sessionmaker:
+        if not self.sessionmakers:
+            return AsyncSessionLocal
+        if self.window > 0:
+            try:
+                recent_write = await self.backend.is_marked(key)
+            except Exception:
+                # Unsure whether the client just wrote; the primary is always current
+                self.errors += 1
+                recent_write = True
+            if recent_write:
+                self.reads["primary"] += 1
+                return AsyncSessionLocal
+        name, sessionmaker = self.pick()
+        self.reads[name] += 1
+        return sessionmaker
+
+    async def mark_write(self, key: str) -> None:
+        if not self.sessionmakers or self.window <= 0:
+            return
+        try:
+            await self.backend.mark(key, self.window)
+            self.writes_marked += 1
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [name for name, _ in self.engines],
+            "balancing": self.balancing,
+            "backend": self.backend.name,
+            "reads": dict(self.reads),
+            "writes_marked": self.writes_marked,
+            "errors": self.errors,
+        }
+
+    async def close(self) -> None:
+        await self.backend.close()
+        for _, engine in self.engines:
+            await engine.dispose()
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware marking clients that sent a write request.
+
+    The mark is made before the response starts, so any read the client sends
+    after seeing the response is routed to the primary.
+    """
+
+    def __init__(self, app, router: "ReplicaRouter"):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS or not self.router.sessionmakers:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_after_marking(message):
+            if message["type"] == "http.response.start":
+                await self.router.mark_write(client_key(scope))
+            await send(message)
+
+        await self.app(scope, receive, send_after_marking)
+
+
+def create_backend(name: str, window: int):
+    if name == "redis":
+        return RedisBackend(settings.redis_url)
+    return MemoryBackend(window)
+
+
+replica_router = ReplicaRouter(
+    [(f"replica{number}", create_replica_engine(url, f"replica{number}"))
+     for number, url in enumerate(settings.database_replica_urls, start=1)],
+    settings.replica_balancing,
+    create_backend(settings.read_your_writes_backend, settings.read_your_writes_seconds),
+    settings.read_your_writes_seconds,
+)
+
+
+async def get_read_sessionmaker(request: Request) -> async_sessionmaker:
+    """Session factory for a read-only request"""
+    return await replica_router.sessionmaker_for(client_key(request.scope))
+
+
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Dependency to get a session for read-only handlers"""
+    sessionmaker = await get_read_sessionmaker(request)
+    async with sessionmaker() as db:
+        yield db
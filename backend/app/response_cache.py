@@ -0,0 +1,173 @@
+"""Read-through cache for serialized list and task responses.
+
+Entries are keyed by user, path and query string, plus the current values of
+the generation counters the response depends on: the user's generation for
+list reads, and the list's generation for task pages. Write handlers bump the
+counters after committing, which orphans every dependent entry at once; the
+orphans simply expire.
+
+The memory backend only sees writes made by its own process. Deployments
+with several workers should use the Redis backend.
+"""
+import hashlib
+import random
+from typing import Iterable, List, Optional, Tuple
+from fastapi import Request, Response
+from app.cache import TTLCache
+from app.config import settings
+from app.serialization import dumps_trusted
+
+
+def user_scope(user_id: str) -> str:
+    """Generation bumped by any write that changes the user's lists"""
+    return f"user:{user_id}"
+
+
+def list_scope(list_id: str) -> str:
+    """Generation bumped by any write that changes a list's tasks"""
+    return f"list:{list_id}"
+
+
+# How long an untouched generation counter is kept by the memory backend
+GENERATION_TTL_SECONDS = 24 * 3600
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.entries = TTLCache("responses", maxsize, ttl)
+        # Bounded like the entries. A counter that was evicted restarts from a
+        # fresh random base rather than 0, so it cannot return to a value that
+        # still keys orphaned entries.
+        self.generations = TTLCache("response_generations", maxsize, GENERATION_TTL_SECONDS)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.entries.set(key, value, ttl)
+
+    def _generation(self, scope: str) -> int:
+        generation = self.generations.get(scope)
+        if generation is None:
+            generation = random.getrandbits(63)
+            self.generations.set(scope, generation)
+        return generation
+
+    async def get_generations(self, scopes: List[str]) -> List[int]:
+        return [self._generation(scope) for scope in scopes]
+
+    async def bump(self, scopes: Iterable[str]) -> None:
+        for scope in scopes:
+            self.generations.set(scope, self._generation(scope) + 1)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def get_generations(self, scopes: List[str]) -> List[int]:
+        values = await self.client.mget([f"gen:{scope}" for scope in scopes])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, scopes: Iterable[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.incr(f"gen:{scope}")
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class ResponseCache:
+    """Caches JSON response bodies; backend errors degrade to cache misses"""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def lookup(self, request: Request, user_id: str, scopes: List[str]) -> Tuple[Optional[str], Optional[Response]]:
+        """Return (key, cached response); the key is None when caching is off"""
+        if self.backend is None:
+            return None, None
+
+        try:
+            generations = await self.backend.get_generations(scopes)
+            shape = "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items()))
+            versions = ",".join(f"{scope}={generation}" for scope, generation in zip(scopes, generations))
+            digest = hashlib.sha1(f"{request.url.path}?{shape}|{versions}".encode()).hexdigest()
+            key = f"resp:{user_id}:{digest}"
+            body = await self.backend.get(key)
+        except Exception:
+            self.errors += 1
+            return None, None
+
+        if body is None:
+            self.misses += 1
+            return key, None
+
+        self.hits += 1
+        return key, Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    async def store(self, key: Optional[str], response_model, value) -> Response:
+        """Serialize value (rows from the database) as response_model, cache it under key and return it"""
+        body = dumps_trusted(response_model, value)
+        if key is not None:
+            try:
+                await self.backend.set(key, body, self.ttl)
+            except Exception:
+                self.errors += 1
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+    async def invalidate(self, *scopes: str) -> None:
+        """Bump generations; call after the write has been committed"""
+        if self.backend is None or not scopes:
+            return
+        try:
+            await self.backend.bump(sorted(set(scopes)))
+        except Exception:
+            # Entries then live until their TTL
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+        }
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def create_backend(name: str):
+    if name == "redis":
+        return RedisBackend(settings.redis_url)
+    if name == "memory":
+        return MemoryBackend(settings.response_cache_max_entries, settings.response_cache_ttl_seconds)
+    return None
+
+
+response_cache = ResponseCache(create_backend(settings.response_cache_backend), settings.response_cache_ttl_seconds)
@@ -1,25 +1,37 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserWithToken, UserResponse
 from app.schemas.common import TokenResponse, MessageResponse
 from app.auth import (
-    get_password_hash, authenticate_user, create_access_token,
-    create_refresh_token, get_current_user
+    authenticate_user_async, create_access_token, create_refresh_token,
+    get_current_user, hashing_busy_exception
 )
+from app.hashing import HashingBusy, hash_password
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _save_user(db: Session, db_user: User) -> None:
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+
+
+# register and login are async so bcrypt waits on the hashing pool rather than
+# holding a threadpool thread; database calls go through run_in_threadpool.
 @router.post("/register", response_model=UserWithToken, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter(
+            (User.email == user_data.email) | (User.username == user_data.username)
+        ).first()
+    )
 
     if existing_user:
         raise HTTPException(
@@ -28,7 +40,10 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await hash_password(user_data.password)
+    except HashingBusy:
+        raise hashing_busy_exception()
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -37,9 +52,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         last_name=user_data.last_name
     )
 
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await run_in_threadpool(_save_user, db, db_user)
 
     # Create access token
     access_token = create_access_token(data={"sub": db_user.id})
@@ -48,9 +61,9 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=UserWithToken)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """User login"""
-    user = authenticate_user(db, user_data.email, user_data.password)
+    user = await authenticate_user_async(db, user_data.email, user_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,29 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.read_replicas import get_read_db
 from app.models.user import User
 from app.models.category import Category
+from app.models.task import Task
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
-from app.auth import get_current_user
+from app.auth import get_current_user_async, get_current_user_for_read_async
+from app.suggestions import prefix_indexes, category_suggestions
+from app.response_cache import response_cache, list_scope, user_scope
+from app.counters import bump_versions
+from app.etags import make_etag, not_modified
+from app.serialization import trusted_response
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("", response_model=list[CategoryResponse])
-def get_categories(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_categories(
+    request: Request,
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's categories"""
-    categories = db.query(Category).filter(Category.user_id == current_user.id).all()
-    return categories
+    data_version = await db.scalar(select(User.data_version).where(User.id == current_user.id))
+    etag = make_etag(request, user_scope(current_user.id), data_version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    categories = (await db.scalars(select(Category).where(Category.user_id == current_user.id))).all()
+    return trusted_response(list[CategoryResponse], categories, headers={"ETag": etag})
 
 
 @router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
     category_data: CategoryCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new category"""
     db_category = Category(
@@ -32,23 +47,32 @@ def create_category(
     )
 
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await bump_versions(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_category)
+
+    prefix_indexes.update(current_user.id, added=category_suggestions(db_category))
 
-    return db_category
+    return trusted_response(CategoryResponse, db_category, status.HTTP_201_CREATED)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(
+async def get_category(
     category_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific category"""
-    db_category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
+    data_version = await db.scalar(select(User.data_version).where(User.id == current_user.id))
+    etag = make_etag(request, user_scope(current_user.id), data_version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    db_category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.user_id == current_user.id)
+    )
 
     if not db_category:
         raise HTTPException(
@@ -56,21 +80,20 @@ def get_category(
             detail="Category not found"
         )
 
-    return db_category
+    return trusted_response(CategoryResponse, db_category, headers={"ETag": etag})
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-def update_category(
+async def update_category(
     category_id: str,
     category_data: CategoryUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a category"""
-    db_category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
+    db_category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.user_id == current_user.id)
+    )
 
     if not db_category:
         raise HTTPException(
@@ -78,28 +101,32 @@ def update_category(
             detail="Category not found"
         )
 
+    old_suggestions = category_suggestions(db_category)
+
     # Update category fields
     update_data = category_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_category, field, value)
 
-    db.commit()
-    db.refresh(db_category)
+    await bump_versions(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_category)
+
+    prefix_indexes.update(current_user.id, removed=old_suggestions, added=category_suggestions(db_category))
 
-    return db_category
+    return trusted_response(CategoryResponse, db_category)
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(
+async def delete_category(
     category_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a category (tasks will be uncategorized)"""
-    db_category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
+    db_category = await db.scalar(
+        select(Category).where(Category.id == category_id, Category.user_id == current_user.id)
+    )
 
     if not db_category:
         raise HTTPException(
@@ -108,10 +135,20 @@ def delete_category(
         )
 
     # Remove category from all tasks
-    from app.models.task import Task
-    tasks = db.query(Task).filter(Task.category_id == category_id).all()
-    for task in tasks:
-        task.category_id = None
-
-    db.delete(db_category)
-    db.commit()
+    list_ids = set(await db.scalars(
+        update(Task)
+        .where(Task.category_id == category_id)
+        .values(category_id=None)
+        .returning(Task.list_id)
+        .execution_options(synchronize_session=False)
+    ))
+
+    await db.delete(db_category)
+    await db.flush()
+    await bump_versions(db, current_user.id, list_ids)
+    await db.commit()
+
+    # Cached task pages of those lists still show the category
+    await response_cache.invalidate(*(list_scope(list_id) for list_id in list_ids))
+
+    prefix_indexes.update(current_user.id, removed=category_suggestions(db_category))
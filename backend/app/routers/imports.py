@@ -0,0 +1,265 @@
+import codecs
+import csv
+import json
+import uuid
+from typing import AsyncIterator, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import ValidationError
+from sqlalchemy import ARRAY, Boolean, Column, DateTime, Integer, MetaData, String, Table, Text, case, cast, func, insert, literal, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
+from app.database import get_async_db
+from app.ids import UUIDString, new_id
+from app.models.user import User
+from app.models.task import Task
+from app.models.category import Category
+from app.schemas.task import TaskImportRow, TaskImportResult
+from app.auth import get_current_user_async
+from app.counters import adjust_task_counts, bump_versions
+from app.routers.tasks import invalidate_task_reads, list_owned
+from app.suggestions import prefix_indexes
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+# Validated rows buffered before each COPY into the staging table
+IMPORT_BATCH_SIZE = 5000
+
+# Per-row errors kept in the progress report; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# Progress of running and recently finished imports, keyed by (user id, import id)
+import_progress = TTLCache("imports", maxsize=1000, ttl=3600)
+
+# Session-local staging table; dropped when the import transaction ends
+staging = Table(
+    "task_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("id", UUIDString, nullable=False),
+    Column("title", String, nullable=False),
+    Column("description", Text),
+    Column("priority", String),
+    Column("due_date", DateTime(timezone=True)),
+    Column("category_id", UUIDString),
+    Column("tags", ARRAY(String)),
+    Column("is_completed", Boolean, nullable=False),
+    Column("completed_at", DateTime(timezone=True)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+STAGING_COLUMNS = [column.name for column in staging.columns]
+
+
+async def read_lines(request: Request) -> AsyncIterator[Tuple[int, str]]:
+    """Yield (line number, line) from the request body as chunks arrive"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            number += 1
+            yield number, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield number + 1, pending.rstrip("\r")
+
+
+async def ndjson_records(request: Request) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line, record, error) per non-empty NDJSON line"""
+    async for number, line in read_lines(request):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except (ValueError, RecursionError) as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+
+def _csv_record(header: list, text: str) -> dict:
+    values = next(csv.reader([text]))
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} fields, got {len(values)}")
+    # Empty cells fall back to the TaskCreate defaults
+    record = {key: value for key, value in zip(header, values) if value != ""}
+    tags = record.get("tags")
+    if tags is not None:
+        record["tags"] = json.loads(tags) if tags.startswith("[") else [tag.strip() for tag in tags.split(",") if tag.strip()]
+    return record
+
+
+async def csv_records(request: Request) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line, record, error) per CSV record; the first record is the header.
+
+    Quoted fields may span lines, so physical lines are joined until the
+    quotes balance before a record is parsed.
+    """
+    header = None
+    text, start = "", 0
+    async for number, line in read_lines(request):
+        if not text:
+            start = number
+            if not line.strip():
+                continue
+        text = f"{text}\n{line}" if text else line
+        if text.count('"') % 2:
+            continue
+        record_text, text = text, ""
+        if header is None:
+            try:
+                header = next(csv.reader([record_text]))
+            except csv.Error as exc:
+                # No record can be read without the header
+                yield start, None, f"Invalid header: {exc}"
+                return
+            continue
+        try:
+            record, error = _csv_record(header, record_text), None
+        except (ValueError, csv.Error) as exc:
+            record, error = None, str(exc)
+        yield start, record, error
+    if text:
+        yield start, None, "Unterminated quoted field"
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+
+def _add_error(progress: dict, line: int, error: str) -> None:
+    progress["failed"] += 1
+    if len(progress["errors"]) < MAX_REPORTED_ERRORS:
+        progress["errors"].append({"line": line, "error": error})
+
+
+async def copy_to_staging(db: AsyncSession, rows: list) -> None:
+    """COPY a batch of validated rows into the staging table"""
+    raw_connection = await (await db.connection()).get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        staging.name, records=rows, columns=STAGING_COLUMNS
+    )
+
+
+@router.post("/tasks", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    list_id: str = Query(..., description="List to import the tasks into"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Body format: ndjson or csv"),
+    import_id: Optional[str] = Query(None, max_length=64, description="Id to poll progress with"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Import tasks from a streamed NDJSON or CSV body.
+
+    Rows are validated against TaskImportRow as they arrive and COPYed into a
+    staging table in batches, then merged into the list with one INSERT ...
+    SELECT. Invalid rows are reported and skipped; the valid ones are imported
+    with new ids, in file order, keeping is_completed and completed_at.
+    Records of another type (e.g. lists and categories in an export file) are
+    ignored.
+    """
+    if not await list_owned(db, list_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="List not found"
+        )
+
+    import_id = import_id or str(uuid.uuid4())
+    progress = {"import_id": import_id, "status": "receiving", "rows": 0, "imported": 0, "failed": 0, "errors": []}
+    import_progress.set((current_user.id, import_id), progress)
+
+    owned_category_ids = set(await db.scalars(select(Category.id).where(Category.user_id == current_user.id)))
+    records = csv_records(request) if format == "csv" else ndjson_records(request)
+    completed = 0
+
+    try:
+        await (await db.connection()).run_sync(staging.create)
+
+        batch = []
+        async for line, record, error in records:
+            if record is not None and record.get("type", "task") != "task":
+                continue
+            progress["rows"] += 1
+            if error is not None:
+                _add_error(progress, line, error)
+                continue
+            try:
+                task_data = TaskImportRow.model_validate(record)
+            except ValidationError as exc:
+                _add_error(progress, line, _validation_message(exc))
+                continue
+            if task_data.category_id and task_data.category_id not in owned_category_ids:
+                _add_error(progress, line, f"Category {task_data.category_id} not found")
+                continue
+
+            # Ids are issued in increasing order, so listings sorted by a tied
+            # created_at keep file order through the id tiebreak
+            batch.append((
+                line, new_id(), task_data.title, task_data.description, task_data.priority,
+                task_data.due_date, task_data.category_id, task_data.tags,
+                task_data.is_completed, task_data.completed_at
+            ))
+            completed += task_data.is_completed
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await copy_to_staging(db, batch)
+                progress["imported"] += len(batch)
+                batch = []
+
+        if batch:
+            await copy_to_staging(db, batch)
+            progress["imported"] += len(batch)
+
+        # Set-based merge; every row gets the same created_at (now())
+        progress["status"] = "merging"
+        await db.execute(
+            insert(Task).from_select(
+                ["id", "list_id", "title", "description", "priority", "due_date", "category_id", "tags", "is_completed", "completed_at"],
+                select(
+                    staging.c.id,
+                    cast(literal(list_id, UUIDString), UUIDString),
+                    staging.c.title,
+                    staging.c.description,
+                    func.coalesce(staging.c.priority, "medium"),
+                    staging.c.due_date,
+                    staging.c.category_id,
+                    func.coalesce(staging.c.tags, literal_column("'{}'::varchar[]")),
+                    staging.c.is_completed,
+                    case((staging.c.is_completed, func.coalesce(staging.c.completed_at, func.now()))),
+                ).order_by(staging.c.line)
+            )
+        )
+        await adjust_task_counts(db, list_id, total_delta=progress["imported"], completed_delta=completed)
+        await bump_versions(db, current_user.id)
+        await db.commit()
+    except Exception:
+        progress["status"] = "failed"
+        progress["imported"] = 0
+        await db.rollback()
+        raise
+
+    progress["status"] = "completed"
+    await invalidate_task_reads(current_user.id, [list_id])
+    prefix_indexes.invalidate(current_user.id)
+
+    return progress
+
+
+@router.get("/tasks/{import_id}", response_model=TaskImportResult)
+async def get_import_progress(
+    import_id: str,
+    current_user: User = Depends(get_current_user_async)
+):
+    """Progress of a running or recently finished import"""
+    progress = import_progress.get((current_user.id, import_id))
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found"
+        )
+    return progress
@@ -1,49 +1,82 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import get_db
+from typing import Optional, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.read_replicas import get_read_db
 from app.models.user import User
 from app.models.todo_list import TodoList
 from app.models.task import Task
 from app.schemas.todo_list import TodoListCreate, TodoListUpdate, TodoListResponse
-from app.schemas.common import PaginatedResponse, PaginationInfo
-from app.auth import get_current_user
+from app.schemas.common import (
+    PaginatedResponse, PaginationInfo, CursorPaginatedResponse, CursorPaginationInfo
+)
+from app.auth import get_current_user_async, get_current_user_for_read_async
 from app.config import settings
+from app.pagination import decode_cursor, order_by_keyset, seek, next_cursor_for
+from app.suggestions import prefix_indexes, list_suggestions
+from app.response_cache import response_cache, user_scope, list_scope
+from app.counters import bump_versions
+from app.etags import make_etag, not_modified
+from app.serialization import trusted_response
+from app.fieldsets import default_fields, load_columns, parse_fields, sparse_model
 
 router = APIRouter(prefix="/lists", tags=["Lists"])
 
+# Fields a list listing returns unless fields= asks for more
+LIST_LISTING_FIELDS = default_fields(TodoListResponse, deferred=["description"])
 
-def get_paginated_lists(
-    db: Session,
+FIELDS_DESCRIPTION = "Comma-separated response fields, or * for all"
+
+
+async def get_paginated_lists(
+    db: AsyncSession,
     user_id: str,
     page: int = 1,
     limit: int = settings.default_page_size,
-    search: Optional[str] = None
-) -> PaginatedResponse[TodoListResponse]:
-    """Get paginated lists with optional search"""
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> Union[PaginatedResponse[TodoListResponse], CursorPaginatedResponse[TodoListResponse]]:
+    """Get paginated lists (newest first) with optional search.
+
+    With fields only those columns (plus the sort key) are loaded.
+    """
     # Build query
-    query = db.query(TodoList).filter(TodoList.owner_id == user_id)
+    query = select(TodoList).where(TodoList.owner_id == user_id)
+    if fields is not None:
+        query = query.options(load_columns(TodoList, fields, "created_at"))
 
     # Add search filter
     if search:
-        query = query.filter(TodoList.name.ilike(f"%{search}%"))
+        query = query.where(TodoList.name.ilike(f"%{search}%"))
+
+    # Lists are always ordered newest first, with id as a stable tiebreaker
+    query = order_by_keyset(query, TodoList.created_at, TodoList.id, "desc")
+
+    # Keyset pagination: seek past the cursor and fetch one extra row to detect a next page
+    if cursor:
+        value, row_id = decode_cursor(cursor, "createdAt", "desc", TodoList.created_at)
+        lists = (await db.scalars(
+            seek(query, TodoList.created_at, TodoList.id, "desc", value, row_id).limit(limit + 1)
+        )).all()
+        has_next = len(lists) > limit
+        lists = lists[:limit]
+
+        pagination_info = CursorPaginationInfo(
+            limit=limit,
+            has_next=has_next,
+            next_cursor=next_cursor_for(lists, "createdAt", "desc", TodoList.created_at) if has_next else None
+        )
+
+        return CursorPaginatedResponse(data=lists, pagination=pagination_info)
 
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
 
     # Apply pagination
     offset = (page - 1) * limit
-    lists = query.offset(offset).limit(limit).all()
-
-    # Calculate task counts for each list
-    for todo_list in lists:
-        task_count = db.query(func.count(Task.id)).filter(Task.list_id == todo_list.id).scalar()
-        completed_count = db.query(func.count(Task.id)).filter(
-            Task.list_id == todo_list.id, Task.is_completed == True
-        ).scalar()
-        todo_list.task_count = task_count
-        todo_list.completed_task_count = completed_count
+    lists = (await db.scalars(query.offset(offset).limit(limit))).all()
 
     # Calculate pagination info
     total_pages = (total + limit - 1) // limit
@@ -56,29 +89,51 @@ def get_paginated_lists(
         total=total,
         total_pages=total_pages,
         has_next=has_next,
-        has_prev=has_prev
+        has_prev=has_prev,
+        next_cursor=next_cursor_for(lists, "createdAt", "desc", TodoList.created_at) if has_next else None
     )
 
     return PaginatedResponse(data=lists, pagination=pagination_info)
 
 
-@router.get("", response_model=PaginatedResponse[TodoListResponse])
-def get_lists(
+@router.get(
+    "",
+    response_model=Union[PaginatedResponse[TodoListResponse], CursorPaginatedResponse[TodoListResponse]]
+)
+async def get_lists(
+    request: Request,
     page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor"),
     limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
     search: Optional[str] = Query(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=f"{FIELDS_DESCRIPTION}; description is left out by default"),
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's lists with pagination and search"""
-    return get_paginated_lists(db, current_user.id, page, limit, search)
+    fieldset = parse_fields(fields, TodoListResponse, LIST_LISTING_FIELDS)
+    data_version = await db.scalar(select(User.data_version).where(User.id == current_user.id))
+    etag = make_etag(request, user_scope(current_user.id), data_version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key, response = await response_cache.lookup(request, current_user.id, [user_scope(current_user.id)])
+    if response is None:
+        result = await get_paginated_lists(db, current_user.id, page, limit, search, cursor, fieldset)
+        item_model = sparse_model(TodoListResponse, fieldset)
+        response_model = CursorPaginatedResponse[item_model] if cursor else PaginatedResponse[item_model]
+        response = await response_cache.store(cache_key, response_model, result)
+
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.post("", response_model=TodoListResponse, status_code=status.HTTP_201_CREATED)
-def create_list(
+async def create_list(
     list_data: TodoListCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new list"""
     db_list = TodoList(
@@ -87,53 +142,70 @@ def create_list(
     )
 
     db.add(db_list)
-    db.commit()
-    db.refresh(db_list)
+    await bump_versions(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_list)
+
+    await response_cache.invalidate(user_scope(current_user.id))
+    prefix_indexes.update(current_user.id, added=list_suggestions(db_list))
 
-    return db_list
+    return trusted_response(TodoListResponse, db_list, status.HTTP_201_CREATED)
 
 
 @router.get("/{list_id}", response_model=TodoListResponse)
-def get_list(
+async def get_list(
     list_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific list"""
-    db_list = db.query(TodoList).filter(
-        TodoList.id == list_id,
-        TodoList.owner_id == current_user.id
-    ).first()
+    fieldset = parse_fields(fields, TodoListResponse, tuple(TodoListResponse.model_fields))
+    version = await db.scalar(
+        select(TodoList.version).where(TodoList.id == list_id, TodoList.owner_id == current_user.id)
+    )
 
-    if not db_list:
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="List not found"
         )
 
-    # Calculate task counts
-    task_count = db.query(func.count(Task.id)).filter(Task.list_id == list_id).scalar()
-    completed_count = db.query(func.count(Task.id)).filter(
-        Task.list_id == list_id, Task.is_completed == True
-    ).scalar()
-    db_list.task_count = task_count
-    db_list.completed_task_count = completed_count
+    etag = make_etag(request, list_scope(list_id), version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key, response = await response_cache.lookup(request, current_user.id, [user_scope(current_user.id)])
+    if response is None:
+        db_list = await db.scalar(
+            select(TodoList)
+            .where(TodoList.id == list_id, TodoList.owner_id == current_user.id)
+            .options(load_columns(TodoList, fieldset))
+        )
+        if not db_list:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="List not found"
+            )
+        response = await response_cache.store(cache_key, sparse_model(TodoListResponse, fieldset), db_list)
 
-    return db_list
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.put("/{list_id}", response_model=TodoListResponse)
-def update_list(
+async def update_list(
     list_id: str,
     list_data: TodoListUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a list"""
-    db_list = db.query(TodoList).filter(
-        TodoList.id == list_id,
-        TodoList.owner_id == current_user.id
-    ).first()
+    db_list = await db.scalar(
+        select(TodoList).where(TodoList.id == list_id, TodoList.owner_id == current_user.id)
+    )
 
     if not db_list:
         raise HTTPException(
@@ -141,28 +213,33 @@ def update_list(
             detail="List not found"
         )
 
+    old_suggestions = list_suggestions(db_list)
+
     # Update list fields
     update_data = list_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_list, field, value)
 
-    db.commit()
-    db.refresh(db_list)
+    await bump_versions(db, current_user.id, [list_id])
+    await db.commit()
+    await db.refresh(db_list)
 
-    return db_list
+    await response_cache.invalidate(user_scope(current_user.id))
+    prefix_indexes.update(current_user.id, removed=old_suggestions, added=list_suggestions(db_list))
+
+    return trusted_response(TodoListResponse, db_list)
 
 
 @router.delete("/{list_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_list(
+async def delete_list(
     list_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a list and all its tasks"""
-    db_list = db.query(TodoList).filter(
-        TodoList.id == list_id,
-        TodoList.owner_id == current_user.id
-    ).first()
+    db_list = await db.scalar(
+        select(TodoList).where(TodoList.id == list_id, TodoList.owner_id == current_user.id)
+    )
 
     if not db_list:
         raise HTTPException(
@@ -170,5 +247,16 @@ def delete_list(
             detail="List not found"
         )
 
-    db.delete(db_list)
-    db.commit()
+    # Delete the tasks in one statement rather than loading them for the ORM cascade
+    await db.execute(
+        delete(Task).where(Task.list_id == list_id).execution_options(synchronize_session=False)
+    )
+    await db.delete(db_list)
+    await db.flush()
+    await bump_versions(db, current_user.id)
+    await db.commit()
+
+    await response_cache.invalidate(user_scope(current_user.id), list_scope(list_id))
+
+    # The list's tasks went with it; rebuilding is cheaper than removing them one by one
+    prefix_indexes.invalidate(current_user.id)
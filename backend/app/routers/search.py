@@ -1,10 +1,11 @@
 from typing import Optional, List
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, select, literal, true, tuple_, union_all
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from pydantic import BaseModel
-from app.database import get_db
+from app.read_replicas import get_read_db
 from app.models.user import User
 from app.models.todo_list import TodoList
 from app.models.task import Task
@@ -12,18 +13,47 @@ from app.models.category import Category
 from app.schemas.todo_list import TodoListResponse
 from app.schemas.task import TaskResponse
 from app.schemas.common import PaginatedResponse, PaginationInfo
-from app.auth import get_current_user
+from app.auth import get_current_user_for_read_async
 from app.config import settings
+from app.suggestions import prefix_indexes
+from app.response_cache import response_cache, user_scope
+from app.etags import make_etag, not_modified
+from app.routers.tasks import PRIORITIES, parse_tags, TAGS_DESCRIPTION, TAGS_ANY_DESCRIPTION
 
 router = APIRouter(tags=["Search"])
 
 
+class SearchHit(BaseModel):
+    type: str
+    id: str
+    rank: float
+
+
 class SearchResult(BaseModel):
     tasks: List[TaskResponse]
     lists: List[TodoListResponse]
+    results: List[SearchHit] = []
     pagination: PaginationInfo
 
 
+class SuggestionItem(BaseModel):
+    text: str
+    type: str
+
+
+class SuggestResponse(BaseModel):
+    suggestions: List[SuggestionItem]
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
+class TagsResponse(BaseModel):
+    tags: List[TagCount]
+
+
 class AnalyticsResponse(BaseModel):
     total_tasks: int
     completed_tasks: int
@@ -34,43 +64,99 @@ class AnalyticsResponse(BaseModel):
     recent_activity: List[dict]
 
 
+# Text search configuration used by the generated search_vector columns
+SEARCH_CONFIG = "english"
+
+
 @router.get("/search", response_model=SearchResult)
-def search_tasks_and_lists(
+async def search_tasks_and_lists(
     q: str = Query(..., description="Search query"),
     type: str = Query("all", description="Search type: tasks, lists, or all"),
     page: int = Query(1, ge=1),
     limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    tags: Optional[str] = Query(None, description=TAGS_DESCRIPTION),
+    tags_any: Optional[str] = Query(None, description=TAGS_ANY_DESCRIPTION),
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Search across tasks and lists"""
-    tasks = []
-    lists = []
-    total_tasks = 0
-    total_lists = 0
+    """Search across tasks and lists.
+
+    Matches the full-text search_vector (title/name, description, tags) or a
+    trigram-indexed substring of the title/name. Tasks and lists are ranked
+    together (ts_rank plus trigram similarity) and paginated as one ordering;
+    `results` gives that merged order. Lists have no tags, so a tag filter
+    restricts the search to tasks.
+    """
+    ts_query = func.websearch_to_tsquery(literal(SEARCH_CONFIG, type_=REGCONFIG), q)
+    tag_filters = []
+    if tags := parse_tags(tags):
+        tag_filters.append(Task.tags.contains(tags))
+    if tags_any := parse_tags(tags_any):
+        tag_filters.append(Task.tags.overlap(tags_any))
+    branches = []
 
     # Search tasks
     if type in ["tasks", "all"]:
-        task_query = db.query(Task).join(TodoList).filter(
-            TodoList.owner_id == current_user.id,
-            Task.title.ilike(f"%{q}%")
+        branches.append(
+            select(
+                literal("task").label("type"),
+                Task.id.label("id"),
+                (func.ts_rank(Task.search_vector, ts_query) + func.similarity(Task.title, q)).label("rank")
+            )
+            .join(TodoList, Task.list_id == TodoList.id)
+            .where(
+                TodoList.owner_id == current_user.id,
+                or_(Task.search_vector.bool_op("@@")(ts_query), Task.title.ilike(f"%{q}%")),
+                *tag_filters
+            )
         )
-        total_tasks = task_query.count()
-        offset = (page - 1) * limit
-        tasks = task_query.offset(offset).limit(limit).all()
 
     # Search lists
-    if type in ["lists", "all"]:
-        list_query = db.query(TodoList).filter(
-            TodoList.owner_id == current_user.id,
-            TodoList.name.ilike(f"%{q}%")
+    if type in ["lists", "all"] and not tag_filters:
+        branches.append(
+            select(
+                literal("list").label("type"),
+                TodoList.id.label("id"),
+                (func.ts_rank(TodoList.search_vector, ts_query) + func.similarity(TodoList.name, q)).label("rank")
+            )
+            .where(
+                TodoList.owner_id == current_user.id,
+                or_(TodoList.search_vector.bool_op("@@")(ts_query), TodoList.name.ilike(f"%{q}%"))
+            )
         )
-        total_lists = list_query.count()
-        offset = (page - 1) * limit
-        lists = list_query.offset(offset).limit(limit).all()
+
+    hits = []
+    total = 0
+    offset = (page - 1) * limit
+
+    if branches:
+        # One ranked ordering across both types; the window count gives the
+        # total without a second query
+        matches = union_all(*branches).subquery() if len(branches) > 1 else branches[0].subquery()
+        hits = (await db.execute(
+            select(matches.c.type, matches.c.id, matches.c.rank, func.count().over().label("total"))
+            .order_by(matches.c.rank.desc(), matches.c.type, matches.c.id)
+            .offset(offset)
+            .limit(limit)
+        )).all()
+
+        if hits:
+            total = hits[0].total
+        elif page > 1:
+            # Past the last page: no row carried the window count
+            total = await db.scalar(select(func.count()).select_from(matches))
+
+    # Load the page's rows and keep them in ranked order
+    task_ids = [hit.id for hit in hits if hit.type == "task"]
+    list_ids = [hit.id for hit in hits if hit.type == "list"]
+    tasks_by_id = {
+        task.id: task for task in await db.scalars(select(Task).where(Task.id.in_(task_ids)))
+    } if task_ids else {}
+    lists_by_id = {
+        todo_list.id: todo_list for todo_list in await db.scalars(select(TodoList).where(TodoList.id.in_(list_ids)))
+    } if list_ids else {}
 
     # Calculate pagination
-    total = total_tasks + total_lists
     total_pages = (total + limit - 1) // limit
     has_next = page < total_pages
     has_prev = page > 1
@@ -85,19 +171,92 @@ def search_tasks_and_lists(
     )
 
     return SearchResult(
-        tasks=tasks,
-        lists=lists,
+        tasks=[tasks_by_id[task_id] for task_id in task_ids if task_id in tasks_by_id],
+        lists=[lists_by_id[list_id] for list_id in list_ids if list_id in lists_by_id],
+        results=[SearchHit(type=hit.type, id=hit.id, rank=hit.rank) for hit in hits],
         pagination=pagination_info
     )
 
 
+@router.get("/search/suggest", response_model=SuggestResponse)
+async def suggest(
+    prefix: str = Query(..., min_length=1, description="Prefix typed so far"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Autocomplete from task titles, list names, category names and tags.
+
+    Served from an in-memory per-user prefix index, so keystrokes after the
+    first one never reach the database.
+    """
+    index = await prefix_indexes.get(db, current_user.id)
+    return SuggestResponse(
+        suggestions=[SuggestionItem(type=kind, text=text) for kind, text in index.suggest(prefix, limit)]
+    )
+
+
+async def count_tags(db: AsyncSession, user_id: str, list_id: Optional[str], limit: int) -> TagsResponse:
+    """Most used tags across a user's tasks (or one of their lists)"""
+    list_filters = [TodoList.id == list_id] if list_id else []
+    tagged = (
+        select(func.unnest(Task.tags).label("tag"))
+        .join(TodoList, Task.list_id == TodoList.id)
+        .where(TodoList.owner_id == user_id, *list_filters)
+        .subquery()
+    )
+    count = func.count().label("count")
+    rows = (await db.execute(
+        select(tagged.c.tag, count)
+        .group_by(tagged.c.tag)
+        .order_by(count.desc(), tagged.c.tag)
+        .limit(limit)
+    )).all()
+
+    # Row.count is the tuple method, so unpack positionally
+    return TagsResponse(tags=[TagCount(tag=tag, count=total) for tag, total in rows])
+
+
+@router.get("/tags", response_model=TagsResponse)
+async def get_tags(
+    request: Request,
+    list_id: Optional[str] = Query(None, description="Only count tasks of this list"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Tags used on the user's tasks, most used first.
+
+    Counted in SQL by unnesting tasks.tags over the user's lists; only the
+    (tag, count) rows leave the database.
+    """
+    data_version = await db.scalar(select(User.data_version).where(User.id == current_user.id))
+    etag = make_etag(request, user_scope(current_user.id), data_version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key, response = await response_cache.lookup(request, current_user.id, [user_scope(current_user.id)])
+    if response is None:
+        result = await count_tags(db, current_user.id, list_id, limit)
+        response = await response_cache.store(cache_key, TagsResponse, result)
+
+    response.headers["ETag"] = etag
+    return response
+
+
 @router.get("/analytics", response_model=AnalyticsResponse)
-def get_user_analytics(
+async def get_user_analytics(
     period: str = Query("month", description="Time period: week, month, year, all"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get user analytics and statistics"""
+    """Get user analytics and statistics.
+
+    Totals, completion, priority and category breakdowns come from a single
+    grouped aggregate (GROUPING SETS with FILTERed counts); recent activity
+    comes from a single UNION ALL query. Two round trips regardless of size.
+    """
     # Calculate date range
     now = datetime.utcnow()
     if period == "week":
@@ -109,90 +268,138 @@ def get_user_analytics(
     else:  # all
         start_date = None
 
-    # Base queries
-    task_query = db.query(Task).join(TodoList).filter(TodoList.owner_id == current_user.id)
-    list_query = db.query(TodoList).filter(TodoList.owner_id == current_user.id)
+    # Base filters
+    task_filters = [TodoList.owner_id == current_user.id]
+    list_filters = [TodoList.owner_id == current_user.id]
 
     # Apply date filter if specified
     if start_date:
-        task_query = task_query.filter(Task.created_at >= start_date)
-        list_query = list_query.filter(TodoList.created_at >= start_date)
+        task_filters.append(Task.created_at >= start_date)
+        list_filters.append(TodoList.created_at >= start_date)
 
-    # Get basic counts
-    total_tasks = task_query.count()
-    completed_tasks = task_query.filter(Task.is_completed == True).count()
-    total_lists = list_query.count()
+    total_lists = select(func.count(TodoList.id)).where(*list_filters).scalar_subquery()
+
+    # One pass over the user's tasks: the () grouping set yields the totals row,
+    # the (category) grouping set yields one row per category
+    stats = (await db.execute(
+        select(
+            func.grouping(Category.id).label("is_total"),
+            Category.id.label("category_id"),
+            Category.name.label("category_name"),
+            func.count(Task.id).label("total"),
+            func.count(Task.id).filter(Task.is_completed == True).label("completed"),
+            *[func.count(Task.id).filter(Task.priority == priority).label(priority) for priority in PRIORITIES],
+            total_lists.label("total_lists")
+        )
+        .select_from(Task)
+        .join(TodoList, Task.list_id == TodoList.id)
+        .outerjoin(Category, and_(Category.id == Task.category_id, Category.user_id == current_user.id))
+        .where(*task_filters)
+        .group_by(func.grouping_sets(tuple_(), tuple_(Category.id, Category.name)))
+    )).all()
+
+    totals = next(row for row in stats if row.is_total)
+    total_tasks = totals.total
+    completed_tasks = totals.completed
 
     # Calculate completion rate
     completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
 
     # Tasks by priority
-    priority_counts = {}
-    for priority in ["low", "medium", "high", "urgent"]:
-        count = task_query.filter(Task.priority == priority).count()
-        priority_counts[priority] = count
-
-    # Tasks by category
-    category_stats = db.query(
-        Category.name,
-        Category.id,
-        func.count(Task.id).label('count')
-    ).join(Task).join(TodoList).filter(
-        TodoList.owner_id == current_user.id
-    ).group_by(Category.id, Category.name).all()
+    priority_counts = {priority: getattr(totals, priority) for priority in PRIORITIES}
 
+    # Tasks by category (uncategorized tasks form a NULL group and are skipped)
     tasks_by_category = [
         {
-            "categoryId": str(cat.id),
-            "categoryName": cat.name,
-            "count": count
+            "categoryId": str(row.category_id),
+            "categoryName": row.category_name,
+            "count": row.total
         }
-        for cat, count in category_stats
+        for row in sorted(stats, key=lambda row: row.total, reverse=True)
+        if not row.is_total and row.category_id is not None
     ]
 
-    # Recent activity (last 10 activities)
-    recent_activities = []
-
-    # Recent task creations
-    recent_tasks = task_query.order_by(Task.created_at.desc()).limit(5).all()
-    for task in recent_tasks:
-        recent_activities.append({
-            "type": "task_created",
-            "timestamp": task.created_at,
-            "description": f"Created task: {task.title}"
-        })
-
-    # Recent task completions
-    recent_completions = task_query.filter(
-        Task.is_completed == True
-    ).order_by(Task.completed_at.desc()).limit(5).all()
-
-    for task in recent_completions:
-        if task.completed_at:
-            recent_activities.append({
-                "type": "task_completed",
-                "timestamp": task.completed_at,
-                "description": f"Completed task: {task.title}"
-            })
-
-    # Recent list creations
-    recent_lists = list_query.order_by(TodoList.created_at.desc()).limit(5).all()
-    for todo_list in recent_lists:
-        recent_activities.append({
-            "type": "list_created",
-            "timestamp": todo_list.created_at,
-            "description": f"Created list: {todo_list.name}"
-        })
-
-    # Sort activities by timestamp and take top 10
-    recent_activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    recent_activities = recent_activities[:10]
+    # Recent activity (last 10 activities): latest 5 of each kind, merged in SQL.
+    # Task branches take the top 5 per list through a LATERAL index scan on
+    # (list_id, created_at) / (list_id, completed_at) instead of sorting every task.
+    user_lists = select(TodoList.id).where(TodoList.owner_id == current_user.id).subquery()
+    task_date_filters = [Task.created_at >= start_date] if start_date else []
+
+    latest_created = (
+        select(Task.created_at, Task.title)
+        .where(Task.list_id == user_lists.c.id, *task_date_filters)
+        .order_by(Task.created_at.desc())
+        .limit(5)
+        .lateral()
+    )
+    recent_created = (
+        select(
+            literal("task_created").label("type"),
+            latest_created.c.created_at.label("timestamp"),
+            latest_created.c.title.label("label")
+        )
+        .select_from(user_lists.join(latest_created, true()))
+        .order_by(latest_created.c.created_at.desc())
+        .limit(5)
+    )
+
+    latest_completed = (
+        select(Task.completed_at, Task.title)
+        .where(
+            Task.list_id == user_lists.c.id,
+            Task.is_completed == True,
+            Task.completed_at.isnot(None),
+            *task_date_filters
+        )
+        .order_by(Task.completed_at.desc())
+        .limit(5)
+        .lateral()
+    )
+    recent_completed = (
+        select(
+            literal("task_completed").label("type"),
+            latest_completed.c.completed_at.label("timestamp"),
+            latest_completed.c.title.label("label")
+        )
+        .select_from(user_lists.join(latest_completed, true()))
+        .order_by(latest_completed.c.completed_at.desc())
+        .limit(5)
+    )
+
+    recent_lists = (
+        select(
+            literal("list_created").label("type"),
+            TodoList.created_at.label("timestamp"),
+            TodoList.name.label("label")
+        )
+        .where(*list_filters)
+        .order_by(TodoList.created_at.desc())
+        .limit(5)
+    )
+    activity = union_all(recent_created, recent_completed, recent_lists).subquery()
+    activity_rows = (await db.execute(
+        select(activity).order_by(activity.c.timestamp.desc()).limit(10)
+    )).all()
+
+    activity_descriptions = {
+        "task_created": "Created task: {}",
+        "task_completed": "Completed task: {}",
+        "list_created": "Created list: {}"
+    }
+    recent_activities = [
+        {
+            "type": row.type,
+            "timestamp": row.timestamp,
+            "description": activity_descriptions[row.type].format(row.label)
+        }
+        for row in activity_rows
+    ]
 
     return AnalyticsResponse(
         total_tasks=total_tasks,
         completed_tasks=completed_tasks,
         completion_rate=round(completion_rate, 2),
-        total_lists=total_lists,
+        total_lists=totals.total_lists,
         tasks_by_priority=priority_counts,
         tasks_by_category=tasks_by_category,
         recent_activity=recent_activities
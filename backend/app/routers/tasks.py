@@ -1,74 +1,312 @@
-from typing import Optional, List
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.database import get_db
+from typing import Iterable, Optional, List, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import Row, Select, case, delete, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.read_replicas import get_read_db
 from app.models.user import User
 from app.models.todo_list import TodoList
 from app.models.task import Task
 from app.models.category import Category
 from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskResponse, BulkTaskCreate,
-    BulkTaskUpdate, BulkTaskDelete
+    BulkTaskUpdate, BulkTaskDelete, BulkTaskUpdateByFilter,
+    BulkTaskDeleteByFilter, BulkTaskResult, CategoryFacet, TaskFacets,
+    FacetedPaginatedResponse, FacetedCursorPaginatedResponse
 )
-from app.schemas.common import PaginatedResponse, PaginationInfo
-from app.auth import get_current_user
+from app.schemas.common import (
+    PaginatedResponse, PaginationInfo, CursorPaginatedResponse, CursorPaginationInfo
+)
+from app.auth import get_current_user_async, get_current_user_for_read_async
 from app.config import settings
+from app.pagination import decode_cursor, order_by_keyset, seek, next_cursor_for
+from app.counters import adjust_task_counts, adjust_task_counts_many, bump_versions, completion_deltas, task_count_deltas
+from app.suggestions import prefix_indexes, task_suggestions, title_and_tag_suggestions
+from app.response_cache import response_cache, user_scope, list_scope
+from app.etags import make_etag, not_modified
+from app.serialization import trusted_response
+from app.fieldsets import default_fields, load_columns, parse_fields, sparse_model
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+# Every column a TaskResponse needs; write statements RETURN these instead of
+# loading ORM objects
+TASK_COLUMNS = [column for column in Task.__table__.columns if column.key != "search_vector"]
+
+# Fields a task listing returns unless fields= asks for more; description is
+# unbounded text and tags an array, and most list views render neither
+TASK_LISTING_FIELDS = default_fields(TaskResponse, deferred=["description", "tags"])
+
+FIELDS_DESCRIPTION = "Comma-separated response fields, or * for all"
+TAGS_DESCRIPTION = "Comma-separated tags; tasks must have all of them"
+TAGS_ANY_DESCRIPTION = "Comma-separated tags; tasks must have at least one of them"
+
+# Rows per multi-row INSERT in bulk creation
+BULK_INSERT_BATCH_SIZE = 1000
+
+TASK_SORT_FIELDS = {
+    "createdAt": Task.created_at,
+    "updatedAt": Task.updated_at,
+    "dueDate": Task.due_date,
+    "priority": Task.priority,
+    "title": Task.title
+}
+
+PRIORITIES = ["low", "medium", "high", "urgent"]
+
+# Columns a listing can count its matches by, by facets= name
+TASK_FACETS = {
+    "completed": Task.is_completed,
+    "priority": Task.priority,
+    "category": Task.category_id
+}
+FACETS_DESCRIPTION = f"Comma-separated counts to return with the page: {', '.join(TASK_FACETS)}"
+
 
-def get_paginated_tasks(
-    db: Session,
+def parse_tags(tags: Optional[str]) -> Optional[List[str]]:
+    """Tag names from a comma-separated query parameter"""
+    if tags is None:
+        return None
+    return list(dict.fromkeys(name.strip() for name in tags.split(",") if name.strip())) or None
+
+
+def task_filters(
     list_id: str,
-    page: int = 1,
-    limit: int = settings.default_page_size,
     completed: Optional[bool] = None,
     priority: Optional[str] = None,
     category_id: Optional[str] = None,
     search: Optional[str] = None,
-    sort_by: str = "createdAt",
-    sort_order: str = "desc"
-) -> PaginatedResponse[TaskResponse]:
-    """Get paginated tasks with filtering and sorting"""
-    # Build query
-    query = db.query(Task).filter(Task.list_id == list_id)
+    tags: Optional[List[str]] = None,
+    tags_any: Optional[List[str]] = None
+) -> list:
+    """WHERE conditions for a list's tasks matching the listing filters.
+
+    tags requires every tag (@>), tags_any at least one (&&); both operators
+    are served by the GIN index on tasks.tags.
+    """
+    conditions = [Task.list_id == list_id]
 
-    # Add filters
     if completed is not None:
-        query = query.filter(Task.is_completed == completed)
+        conditions.append(Task.is_completed == completed)
 
     if priority:
-        query = query.filter(Task.priority == priority)
+        conditions.append(Task.priority == priority)
 
     if category_id:
-        query = query.filter(Task.category_id == category_id)
+        conditions.append(Task.category_id == category_id)
 
     if search:
-        query = query.filter(Task.title.ilike(f"%{search}%"))
+        conditions.append(Task.title.ilike(f"%{search}%"))
+
+    if tags:
+        conditions.append(Task.tags.contains(tags))
+
+    if tags_any:
+        conditions.append(Task.tags.overlap(tags_any))
+
+    return conditions
+
+
+def parse_facets(facets: Optional[str]) -> Tuple[str, ...]:
+    """Facet names selected by a facets= parameter"""
+    if facets is None:
+        return ()
+
+    requested = {name.strip() for name in facets.split(",") if name.strip()}
+    unknown = requested - set(TASK_FACETS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown facets: {', '.join(sorted(unknown))}"
+        )
+    return tuple(name for name in TASK_FACETS if name in requested)
+
+
+async def count_facets(db: AsyncSession, conditions: list, facets: Tuple[str, ...]) -> Tuple[int, TaskFacets]:
+    """Total and per-facet counts of the tasks matching conditions.
+
+    One pass over the matches: the () grouping set yields the total, each
+    facet column's grouping set one row per value; grouping() tells them apart.
+    """
+    columns = [TASK_FACETS[name] for name in facets]
+    rows = (await db.execute(
+        select(*columns, *[func.grouping(column) for column in columns], func.count())
+        .where(*conditions)
+        .group_by(func.grouping_sets(tuple_(), *[tuple_(column) for column in columns]))
+    )).all()
+
+    total = 0
+    completed = {"open": 0, "completed": 0}
+    priority = dict.fromkeys(PRIORITIES, 0)
+    category = []
+    for row in rows:
+        values, grouped, count = row[:len(columns)], row[len(columns):-1], row[-1]
+        facet = next((name for name, rolled_up in zip(facets, grouped) if not rolled_up), None)
+        value = values[facets.index(facet)] if facet else None
+        if facet is None:
+            total = count
+        elif facet == "completed":
+            completed["completed" if value else "open"] += count
+        elif facet == "priority" and value is not None:
+            priority[value] = count
+        elif facet == "category":
+            category.append(CategoryFacet(category_id=value, count=count))
+    category.sort(key=lambda item: (-item.count, item.category_id or ""))
+
+    counts = {"completed": completed, "priority": priority, "category": category}
+    return total, TaskFacets(**{name: counts[name] for name in facets})
+
+
+async def list_owned(db: AsyncSession, list_id: str, user_id: str) -> bool:
+    """Whether the list exists and belongs to the user"""
+    return await db.scalar(
+        select(TodoList.id).where(TodoList.id == list_id, TodoList.owner_id == user_id)
+    ) is not None
+
+
+async def category_owned(db: AsyncSession, category_id: str, user_id: str) -> bool:
+    """Whether the category exists and belongs to the user"""
+    return await db.scalar(
+        select(Category.id).where(Category.id == category_id, Category.user_id == user_id)
+    ) is not None
+
+
+def owned_tasks(user_id: str) -> Select:
+    """Select tasks in the user's lists"""
+    return select(Task).join(TodoList, Task.list_id == TodoList.id).where(TodoList.owner_id == user_id)
+
+
+async def update_owned_tasks(db: AsyncSession, user_id: str, conditions: list, updates: TaskUpdate) -> List[Row]:
+    """Apply updates to the user's tasks matching conditions in one statement.
+
+    The target rows are locked in a CTE that also carries their previous
+    is_completed, title and tags, returned next to the new columns as
+    was_completed, old_title and old_tags. completed_at is set in SQL from
+    the completion transition. Does not commit.
+    """
+    target = (
+        select(Task.id, Task.is_completed, Task.title, Task.tags)
+        .join(TodoList, Task.list_id == TodoList.id)
+        .where(TodoList.owner_id == user_id, *conditions)
+        .with_for_update(of=Task)
+        .cte("target")
+    )
+    previous = [
+        target.c.is_completed.label("was_completed"),
+        target.c.title.label("old_title"),
+        target.c.tags.label("old_tags")
+    ]
+
+    values = updates.dict(exclude_unset=True)
+    if updates.is_completed is not None:
+        # SET expressions see the old row: keep the timestamp of tasks that
+        # were already completed
+        values["completed_at"] = case(
+            (Task.is_completed == True, Task.completed_at), else_=func.now()
+        ) if updates.is_completed else None
+
+    if not values:
+        return (await db.execute(select(*TASK_COLUMNS, *previous).join(target, Task.id == target.c.id))).all()
+
+    return (await db.execute(
+        update(Task)
+        .where(Task.id == target.c.id)
+        .values(**values)
+        .returning(*TASK_COLUMNS, *previous)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+
+async def delete_owned_tasks(db: AsyncSession, user_id: str, conditions: list) -> List[Row]:
+    """Delete the user's tasks matching conditions in one statement; does not commit"""
+    return (await db.execute(
+        delete(Task)
+        .where(Task.list_id == TodoList.id, TodoList.owner_id == user_id, *conditions)
+        .returning(Task.id, Task.list_id, Task.is_completed, Task.title, Task.tags)
+        .execution_options(synchronize_session=False)
+    )).all()
+
+
+def update_prefix_index(user_id: str, rows: List[Row], updates: TaskUpdate) -> None:
+    """Apply bulk-updated rows to the user's autocomplete index"""
+    changed = updates.dict(exclude_unset=True)
+    if "title" not in changed and "tags" not in changed:
+        return
+    prefix_indexes.update(
+        user_id,
+        removed=[s for row in rows for s in title_and_tag_suggestions(row.old_title, row.old_tags)],
+        added=[s for row in rows for s in task_suggestions(row)]
+    )
+
+
+async def invalidate_task_reads(user_id: str, list_ids: Iterable[str]) -> None:
+    """Drop cached task pages of the lists, and the user's list reads whose
+    task counters changed; call after committing"""
+    await response_cache.invalidate(user_scope(user_id), *(list_scope(list_id) for list_id in list_ids))
+
+
+async def get_paginated_tasks(
+    db: AsyncSession,
+    list_id: str,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    completed: Optional[bool] = None,
+    priority: Optional[str] = None,
+    category_id: Optional[str] = None,
+    search: Optional[str] = None,
+    sort_by: str = "createdAt",
+    sort_order: str = "desc",
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+    tags: Optional[List[str]] = None,
+    tags_any: Optional[List[str]] = None,
+    facets: Tuple[str, ...] = ()
+) -> Union[PaginatedResponse[TaskResponse], CursorPaginatedResponse[TaskResponse]]:
+    """Get paginated tasks with filtering and sorting.
+
+    With a cursor the page is fetched by seeking on (sort field, id) instead of
+    OFFSET, and no total count is computed. With fields only those columns
+    (plus the sort key) are loaded. With facets the response also carries
+    counts of the matching tasks per facet value, from the query that counts
+    the total.
+    """
+    # Build query
+    conditions = task_filters(list_id, completed, priority, category_id, search, tags, tags_any)
+    query = select(Task).where(*conditions)
 
     # Add sorting
-    sort_field_map = {
-        "createdAt": Task.created_at,
-        "updatedAt": Task.updated_at,
-        "dueDate": Task.due_date,
-        "priority": Task.priority,
-        "title": Task.title
-    }
-
-    sort_field = sort_field_map.get(sort_by, Task.created_at)
-    if sort_order == "asc":
-        query = query.order_by(sort_field.asc())
-    else:
-        query = query.order_by(sort_field.desc())
+    sort_field = TASK_SORT_FIELDS.get(sort_by, Task.created_at)
+    if fields is not None:
+        query = query.options(load_columns(Task, fields, sort_field.key))
+    query = order_by_keyset(query, sort_field, Task.id, sort_order)
+
+    # Keyset pagination: seek past the cursor and fetch one extra row to detect a next page
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_by, sort_order, sort_field)
+        tasks = (await db.scalars(seek(query, sort_field, Task.id, sort_order, value, row_id).limit(limit + 1))).all()
+        has_next = len(tasks) > limit
+        tasks = tasks[:limit]
+
+        pagination_info = CursorPaginationInfo(
+            limit=limit,
+            has_next=has_next,
+            next_cursor=next_cursor_for(tasks, sort_by, sort_order, sort_field) if has_next else None
+        )
+
+        if facets:
+            _, facet_counts = await count_facets(db, conditions, facets)
+            return FacetedCursorPaginatedResponse(data=tasks, pagination=pagination_info, facets=facet_counts)
+        return CursorPaginatedResponse(data=tasks, pagination=pagination_info)
 
     # Get total count
-    total = query.count()
+    if facets:
+        total, facet_counts = await count_facets(db, conditions, facets)
+    else:
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
 
     # Apply pagination
     offset = (page - 1) * limit
-    tasks = query.offset(offset).limit(limit).all()
+    tasks = (await db.scalars(query.offset(offset).limit(limit))).all()
 
     # Calculate pagination info
     total_pages = (total + limit - 1) // limit
@@ -81,76 +319,98 @@ def get_paginated_tasks(
         total=total,
         total_pages=total_pages,
         has_next=has_next,
-        has_prev=has_prev
+        has_prev=has_prev,
+        next_cursor=next_cursor_for(tasks, sort_by, sort_order, sort_field) if has_next else None
     )
 
+    if facets:
+        return FacetedPaginatedResponse(data=tasks, pagination=pagination_info, facets=facet_counts)
     return PaginatedResponse(data=tasks, pagination=pagination_info)
 
 
-@router.get("/{list_id}/tasks", response_model=PaginatedResponse[TaskResponse])
-def get_tasks(
+@router.get(
+    "/{list_id}/tasks",
+    response_model=Union[
+        PaginatedResponse[TaskResponse], CursorPaginatedResponse[TaskResponse],
+        FacetedPaginatedResponse[TaskResponse], FacetedCursorPaginatedResponse[TaskResponse]
+    ]
+)
+async def get_tasks(
     list_id: str,
+    request: Request,
     page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor"),
     limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
     completed: Optional[bool] = Query(None),
     priority: Optional[str] = Query(None),
     category_id: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description=TAGS_DESCRIPTION),
+    tags_any: Optional[str] = Query(None, description=TAGS_ANY_DESCRIPTION),
     sort_by: str = Query("createdAt"),
     sort_order: str = Query("desc"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=f"{FIELDS_DESCRIPTION}; description and tags are left out by default"),
+    facets: Optional[str] = Query(None, description=FACETS_DESCRIPTION),
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get tasks in a list with filtering and sorting"""
-    # Verify list ownership
-    list_exists = db.query(TodoList).filter(
-        TodoList.id == list_id,
-        TodoList.owner_id == current_user.id
-    ).first()
-
-    if not list_exists:
+    fieldset = parse_fields(fields, TaskResponse, TASK_LISTING_FIELDS)
+    facet_names = parse_facets(facets)
+    # Verify list ownership; the list's change version doubles as the ETag source
+    version = await db.scalar(
+        select(TodoList.version).where(TodoList.id == list_id, TodoList.owner_id == current_user.id)
+    )
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="List not found"
         )
 
-    return get_paginated_tasks(
-        db, list_id, page, limit, completed, priority, category_id, search, sort_by, sort_order
-    )
+    etag = make_etag(request, list_scope(list_id), version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    cache_key, response = await response_cache.lookup(request, current_user.id, [list_scope(list_id)])
+    if response is None:
+        result = await get_paginated_tasks(
+            db, list_id, page, limit, completed, priority, category_id, search, sort_by, sort_order, cursor, fieldset,
+            parse_tags(tags), parse_tags(tags_any), facet_names
+        )
+        item_model = sparse_model(TaskResponse, fieldset)
+        if facet_names:
+            page_model = FacetedCursorPaginatedResponse if cursor else FacetedPaginatedResponse
+        else:
+            page_model = CursorPaginatedResponse if cursor else PaginatedResponse
+        response_model = page_model[item_model]
+        response = await response_cache.store(cache_key, response_model, result)
+
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.post("/{list_id}/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     list_id: str,
     task_data: TaskCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new task in a list"""
     # Verify list ownership
-    list_exists = db.query(TodoList).filter(
-        TodoList.id == list_id,
-        TodoList.owner_id == current_user.id
-    ).first()
-
-    if not list_exists:
+    if not await list_owned(db, list_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="List not found"
         )
 
     # Verify category ownership if provided
-    if task_data.category_id:
-        category_exists = db.query(Category).filter(
-            Category.id == task_data.category_id,
-            Category.user_id == current_user.id
-        ).first()
-
-        if not category_exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
+    if task_data.category_id and not await category_owned(db, task_data.category_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
 
     db_task = Task(
         **task_data.dict(),
@@ -158,23 +418,29 @@ def create_task(
     )
 
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await adjust_task_counts(db, list_id, total_delta=1)
+    await bump_versions(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_task)
+
+    await invalidate_task_reads(current_user.id, [list_id])
+    prefix_indexes.update(current_user.id, added=task_suggestions(db_task))
 
-    return db_task
+    return trusted_response(TaskResponse, db_task, status.HTTP_201_CREATED)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(
+async def get_task(
     task_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: User = Depends(get_current_user_for_read_async),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific task"""
-    db_task = db.query(Task).join(TodoList).filter(
-        Task.id == task_id,
-        TodoList.owner_id == current_user.id
-    ).first()
+    fieldset = parse_fields(fields, TaskResponse, tuple(TaskResponse.model_fields))
+    db_task = await db.scalar(
+        owned_tasks(current_user.id).where(Task.id == task_id).options(load_columns(Task, fieldset))
+    )
 
     if not db_task:
         raise HTTPException(
@@ -182,92 +448,90 @@ def get_task(
             detail="Task not found"
         )
 
-    return db_task
+    return trusted_response(sparse_model(TaskResponse, fieldset), db_task)
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_id: str,
     task_data: TaskUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a task"""
-    db_task = db.query(Task).join(TodoList).filter(
-        Task.id == task_id,
-        TodoList.owner_id == current_user.id
-    ).first()
-
-    if not db_task:
+    # Verify category ownership if being updated
+    if task_data.category_id and not await category_owned(db, task_data.category_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
+            detail="Category not found"
         )
 
-    # Verify category ownership if being updated
-    if task_data.category_id and task_data.category_id != db_task.category_id:
-        category_exists = db.query(Category).filter(
-            Category.id == task_data.category_id,
-            Category.user_id == current_user.id
-        ).first()
-
-        if not category_exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
+    # One UPDATE ... RETURNING on the locked row: the counter delta comes from
+    # the row's state at the time of the write, not from an earlier read
+    rows = await update_owned_tasks(db, current_user.id, [Task.id == task_id], task_data)
 
-    # Update task fields
-    update_data = task_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_task, field, value)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
 
-    # Update completion timestamp
-    if task_data.is_completed is not None:
-        if task_data.is_completed and not db_task.is_completed:
-            db_task.completed_at = datetime.utcnow()
-        elif not task_data.is_completed:
-            db_task.completed_at = None
+    db_task = rows[0]
+    await adjust_task_counts(
+        db, db_task.list_id, completed_delta=int(bool(db_task.is_completed)) - int(bool(db_task.was_completed))
+    )
+    await bump_versions(db, current_user.id)
+    await db.commit()
 
-    db.commit()
-    db.refresh(db_task)
+    await invalidate_task_reads(current_user.id, [db_task.list_id])
+    update_prefix_index(current_user.id, rows, task_data)
 
-    return db_task
+    return trusted_response(TaskResponse, db_task)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a task"""
-    db_task = db.query(Task).join(TodoList).filter(
-        Task.id == task_id,
-        TodoList.owner_id == current_user.id
-    ).first()
+    # Counters are adjusted from the row the DELETE removed, so a concurrent
+    # delete of the same task finds nothing and gets a 404
+    deleted = await delete_owned_tasks(db, current_user.id, [Task.id == task_id])
 
-    if not db_task:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
 
-    db.delete(db_task)
-    db.commit()
+    db_task = deleted[0]
+    await adjust_task_counts(db, db_task.list_id, total_delta=-1, completed_delta=-int(bool(db_task.is_completed)))
+    await bump_versions(db, current_user.id)
+    await db.commit()
+
+    await invalidate_task_reads(current_user.id, [db_task.list_id])
+    prefix_indexes.update(current_user.id, removed=task_suggestions(db_task))
 
 
 @router.patch("/{task_id}/toggle", response_model=TaskResponse)
-def toggle_task_completion(
+async def toggle_task_completion(
     task_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Toggle task completion status"""
-    db_task = db.query(Task).join(TodoList).filter(
-        Task.id == task_id,
-        TodoList.owner_id == current_user.id
-    ).first()
+    db_task = (await db.execute(
+        update(Task)
+        .where(Task.id == task_id, Task.list_id == TodoList.id, TodoList.owner_id == current_user.id)
+        .values(
+            is_completed=Task.is_completed.is_not(True),
+            completed_at=case((Task.is_completed == True, None), else_=func.now())
+        )
+        .returning(*TASK_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).one_or_none()
 
     if not db_task:
         raise HTTPException(
@@ -275,146 +539,199 @@ def toggle_task_completion(
             detail="Task not found"
         )
 
-    # Toggle completion status
-    db_task.is_completed = not db_task.is_completed
-
-    if db_task.is_completed:
-        db_task.completed_at = datetime.utcnow()
-    else:
-        db_task.completed_at = None
+    await adjust_task_counts(db, db_task.list_id, completed_delta=1 if db_task.is_completed else -1)
+    await bump_versions(db, current_user.id)
+    await db.commit()
 
-    db.commit()
-    db.refresh(db_task)
+    await invalidate_task_reads(current_user.id, [db_task.list_id])
 
-    return db_task
+    return trusted_response(TaskResponse, db_task)
 
 
 # Bulk operations
 @router.post("/bulk", response_model=List[TaskResponse], status_code=status.HTTP_201_CREATED)
-def bulk_create_tasks(
+async def bulk_create_tasks(
     bulk_data: BulkTaskCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create multiple tasks at once"""
     # Verify list ownership
-    list_exists = db.query(TodoList).filter(
-        TodoList.id == bulk_data.list_id,
-        TodoList.owner_id == current_user.id
-    ).first()
-
-    if not list_exists:
+    if not await list_owned(db, bulk_data.list_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="List not found"
         )
 
-    created_tasks = []
-    for task_data in bulk_data.tasks:
-        # Verify category ownership if provided
-        if task_data.category_id:
-            category_exists = db.query(Category).filter(
-                Category.id == task_data.category_id,
-                Category.user_id == current_user.id
-            ).first()
-
-            if not category_exists:
+    # Verify ownership of every referenced category in one query
+    category_ids = {task_data.category_id for task_data in bulk_data.tasks if task_data.category_id}
+    if category_ids:
+        owned_category_ids = set(await db.scalars(
+            select(Category.id).where(Category.id.in_(category_ids), Category.user_id == current_user.id)
+        ))
+        for task_data in bulk_data.tasks:
+            if task_data.category_id and task_data.category_id not in owned_category_ids:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Category {task_data.category_id} not found"
                 )
 
-        db_task = Task(
-            **task_data.dict(),
-            list_id=bulk_data.list_id
+    # Multi-row INSERT ... RETURNING per batch; rows come back as plain tuples,
+    # so no ORM objects pile up in the session for large batches
+    created_tasks = []
+    for start in range(0, len(bulk_data.tasks), BULK_INSERT_BATCH_SIZE):
+        batch = bulk_data.tasks[start:start + BULK_INSERT_BATCH_SIZE]
+        result = await db.execute(
+            insert(Task)
+            .returning(*TASK_COLUMNS, sort_by_parameter_order=True)
+            # Send NULLs explicitly so rows with and without e.g. a category
+            # share one statement instead of being split by key set
+            .execution_options(render_nulls=True),
+            [{**task_data.dict(), "list_id": bulk_data.list_id} for task_data in batch]
         )
-        db.add(db_task)
-        created_tasks.append(db_task)
+        created_tasks.extend(result.all())
 
-    db.commit()
+    await adjust_task_counts(db, bulk_data.list_id, total_delta=len(created_tasks))
+    await bump_versions(db, current_user.id)
+    await db.commit()
 
-    # Refresh all created tasks
-    for task in created_tasks:
-        db.refresh(task)
+    await invalidate_task_reads(current_user.id, [bulk_data.list_id])
+    prefix_indexes.update(
+        current_user.id, added=[s for task in created_tasks for s in task_suggestions(task)]
+    )
 
-    return created_tasks
+    return trusted_response(List[TaskResponse], created_tasks, status.HTTP_201_CREATED)
 
 
 @router.patch("/bulk/update", response_model=List[TaskResponse])
-def bulk_update_tasks(
+async def bulk_update_tasks(
     bulk_data: BulkTaskUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update multiple tasks at once"""
-    # Get tasks that belong to user's lists
-    tasks = db.query(Task).join(TodoList).filter(
-        Task.id.in_(bulk_data.task_ids),
-        TodoList.owner_id == current_user.id
-    ).all()
+    task_ids = set(bulk_data.task_ids)
 
-    if len(tasks) != len(bulk_data.task_ids):
+    # Verify category ownership if being updated
+    if bulk_data.updates.category_id and not await category_owned(db, bulk_data.updates.category_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Some tasks not found or not accessible"
+            detail="Category not found"
         )
 
-    # Verify category ownership if being updated
-    if bulk_data.updates.category_id:
-        category_exists = db.query(Category).filter(
-            Category.id == bulk_data.updates.category_id,
-            Category.user_id == current_user.id
-        ).first()
-
-        if not category_exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
-
-    # Update all tasks
-    update_data = bulk_data.updates.dict(exclude_unset=True)
-    for task in tasks:
-        for field, value in update_data.items():
-            setattr(task, field, value)
+    # Update the tasks that belong to the user's lists; all or nothing
+    tasks = await update_owned_tasks(db, current_user.id, [Task.id.in_(task_ids)], bulk_data.updates)
 
-        # Update completion timestamp
-        if bulk_data.updates.is_completed is not None:
-            if bulk_data.updates.is_completed and not task.is_completed:
-                task.completed_at = datetime.utcnow()
-            elif not bulk_data.updates.is_completed:
-                task.completed_at = None
+    if len(tasks) != len(task_ids):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Some tasks not found or not accessible"
+        )
 
-    db.commit()
+    await adjust_task_counts_many(db, completion_deltas(tasks))
+    await bump_versions(db, current_user.id)
+    await db.commit()
 
-    # Refresh all updated tasks
-    for task in tasks:
-        db.refresh(task)
+    await invalidate_task_reads(current_user.id, {task.list_id for task in tasks})
+    update_prefix_index(current_user.id, tasks, bulk_data.updates)
 
-    return tasks
+    return trusted_response(List[TaskResponse], tasks)
 
 
 @router.delete("/bulk/delete", status_code=status.HTTP_204_NO_CONTENT)
-def bulk_delete_tasks(
+async def bulk_delete_tasks(
     bulk_data: BulkTaskDelete,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete multiple tasks at once"""
-    # Get tasks that belong to user's lists
-    tasks = db.query(Task).join(TodoList).filter(
-        Task.id.in_(bulk_data.task_ids),
-        TodoList.owner_id == current_user.id
-    ).all()
+    task_ids = set(bulk_data.task_ids)
 
-    if len(tasks) != len(bulk_data.task_ids):
+    # Delete the tasks that belong to the user's lists; all or nothing
+    tasks = await delete_owned_tasks(db, current_user.id, [Task.id.in_(task_ids)])
+
+    if len(tasks) != len(task_ids):
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Some tasks not found or not accessible"
         )
 
-    # Delete all tasks
-    for task in tasks:
-        db.delete(task)
+    await adjust_task_counts_many(db, task_count_deltas(tasks, sign=-1))
+    await bump_versions(db, current_user.id)
+    await db.commit()
+
+    await invalidate_task_reads(current_user.id, {task.list_id for task in tasks})
+    prefix_indexes.update(current_user.id, removed=[s for task in tasks for s in task_suggestions(task)])
+
+
+@router.patch("/bulk/update-by-filter", response_model=BulkTaskResult)
+async def bulk_update_tasks_by_filter(
+    bulk_data: BulkTaskUpdateByFilter,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update every task in a list that matches a filter"""
+    task_filter = bulk_data.filter
+
+    # Verify list ownership
+    if not await list_owned(db, task_filter.list_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="List not found"
+        )
+
+    # Verify category ownership if being updated
+    if bulk_data.updates.category_id and not await category_owned(db, bulk_data.updates.category_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+
+    conditions = task_filters(
+        task_filter.list_id, task_filter.completed, task_filter.priority, task_filter.category_id, task_filter.search,
+        task_filter.tags, task_filter.tags_any
+    )
+    tasks = await update_owned_tasks(db, current_user.id, conditions, bulk_data.updates)
+
+    await adjust_task_counts_many(db, completion_deltas(tasks))
+    await bump_versions(db, current_user.id)
+    await db.commit()
+
+    await invalidate_task_reads(current_user.id, {task.list_id for task in tasks})
+    update_prefix_index(current_user.id, tasks, bulk_data.updates)
+
+    return BulkTaskResult(count=len(tasks))
+
+
+@router.delete("/bulk/delete-by-filter", response_model=BulkTaskResult)
+async def bulk_delete_tasks_by_filter(
+    bulk_data: BulkTaskDeleteByFilter,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete every task in a list that matches a filter"""
+    task_filter = bulk_data.filter
+
+    # Verify list ownership
+    if not await list_owned(db, task_filter.list_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="List not found"
+        )
+
+    conditions = task_filters(
+        task_filter.list_id, task_filter.completed, task_filter.priority, task_filter.category_id, task_filter.search,
+        task_filter.tags, task_filter.tags_any
+    )
+    tasks = await delete_owned_tasks(db, current_user.id, conditions)
+
+    await adjust_task_counts_many(db, task_count_deltas(tasks, sign=-1))
+    await bump_versions(db, current_user.id)
+    await db.commit()
+
+    await invalidate_task_reads(current_user.id, {task.list_id for task in tasks})
+    prefix_indexes.update(current_user.id, removed=[s for task in tasks for s in task_suggestions(task)])
 
-    db.commit()
+    return BulkTaskResult(count=len(tasks))
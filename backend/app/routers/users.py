@@ -21,8 +21,16 @@ def update_current_user_profile(
     db: Session = Depends(get_db)
 ):
     """Update current user profile"""
+    # current_user may be a cached snapshot; change the row tracked by this session
+    db_user = db.query(User).filter(User.id == current_user.id).first()
+    if not db_user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
     # Check if username is already taken (if being updated)
-    if user_data.username and user_data.username != current_user.username:
+    if user_data.username and user_data.username != db_user.username:
         existing_user = db.query(User).filter(User.username == user_data.username).first()
         if existing_user:
             raise HTTPException(
@@ -33,9 +41,10 @@ def update_current_user_profile(
     # Update user fields
     update_data = user_data.dict(exclude_unset=True)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(db_user, field, value)
 
+    # Committing the change drops the cached user (see app.auth)
     db.commit()
-    db.refresh(current_user)
+    db.refresh(db_user)
 
-    return current_user
+    return db_user
@@ -2,12 +2,12 @@ from .user import UserCreate, UserUpdate, UserResponse, UserLogin
 from .todo_list import TodoListCreate, TodoListUpdate, TodoListResponse
 from .task import TaskCreate, TaskUpdate, TaskResponse
 from .category import CategoryCreate, CategoryUpdate, CategoryResponse
-from .common import PaginatedResponse, ErrorResponse
+from .common import PaginatedResponse, CursorPaginatedResponse, ErrorResponse
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin",
     "TodoListCreate", "TodoListUpdate", "TodoListResponse",
     "TaskCreate", "TaskUpdate", "TaskResponse",
     "CategoryCreate", "CategoryUpdate", "CategoryResponse",
-    "PaginatedResponse", "ErrorResponse"
+    "PaginatedResponse", "CursorPaginatedResponse", "ErrorResponse"
 ]
@@ -12,6 +12,7 @@ class PaginationInfo(BaseModel):
     total_pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -19,6 +20,17 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pagination: PaginationInfo
 
 
+class CursorPaginationInfo(BaseModel):
+    limit: int
+    has_next: bool
+    next_cursor: Optional[str] = None
+
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    data: List[T]
+    pagination: CursorPaginationInfo
+
+
 class ErrorResponse(BaseModel):
     error: str
     code: str
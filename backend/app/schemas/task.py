@@ -1,6 +1,8 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Generic, Optional, List, Dict
 from datetime import datetime
+from app.ids import IdString
+from app.schemas.common import T, PaginatedResponse, CursorPaginatedResponse
 
 
 class TaskBase(BaseModel):
@@ -8,7 +10,7 @@ class TaskBase(BaseModel):
     description: Optional[str] = None
     priority: Optional[str] = "medium"  # low, medium, high, urgent
     due_date: Optional[datetime] = None
-    category_id: Optional[str] = None
+    category_id: Optional[IdString] = None
     tags: Optional[List[str]] = []
 
 
@@ -34,14 +36,77 @@ class TaskResponse(TaskBase):
 
 
 class BulkTaskCreate(BaseModel):
-    list_id: str
+    list_id: IdString
     tasks: List[TaskCreate]
 
 
 class BulkTaskUpdate(BaseModel):
-    task_ids: List[str]
+    task_ids: List[IdString]
     updates: TaskUpdate
 
 
 class BulkTaskDelete(BaseModel):
-    task_ids: List[str]
+    task_ids: List[IdString]
+
+
+class TaskFilter(BaseModel):
+    list_id: IdString
+    completed: Optional[bool] = None
+    priority: Optional[str] = None
+    category_id: Optional[IdString] = None
+    search: Optional[str] = None
+    tags: Optional[List[str]] = None  # tasks having all of them
+    tags_any: Optional[List[str]] = None  # tasks having at least one
+
+
+class CategoryFacet(BaseModel):
+    category_id: Optional[str] = None  # None counts uncategorized tasks
+    count: int
+
+
+class TaskFacets(BaseModel):
+    """Counts of the tasks matching a listing's filters; only requested facets are set"""
+    completed: Optional[Dict[str, int]] = None  # open, completed
+    priority: Optional[Dict[str, int]] = None  # low, medium, high, urgent
+    category: Optional[List[CategoryFacet]] = None  # most tasks first
+
+
+class FacetedPaginatedResponse(PaginatedResponse[T], Generic[T]):
+    facets: TaskFacets
+
+
+class FacetedCursorPaginatedResponse(CursorPaginatedResponse[T], Generic[T]):
+    facets: TaskFacets
+
+
+class TaskImportRow(TaskCreate):
+    """A task record in an import file; completion carries over from exports"""
+    is_completed: bool = False
+    completed_at: Optional[datetime] = None
+
+
+class BulkTaskUpdateByFilter(BaseModel):
+    filter: TaskFilter
+    updates: TaskUpdate
+
+
+class BulkTaskDeleteByFilter(BaseModel):
+    filter: TaskFilter
+
+
+class BulkTaskResult(BaseModel):
+    count: int
+
+
+class TaskImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class TaskImportResult(BaseModel):
+    import_id: str
+    status: str  # receiving, merging, completed, failed
+    rows: int
+    imported: int
+    failed: int
+    errors: List[TaskImportRowError]
@@ -0,0 +1,99 @@
+"""JSON encoding for responses built from database rows.
+
+A handler with a response_model has FastAPI validate its return value against
+the model and run it through jsonable_encoder before encoding; the response
+cache did the same with model_validate(from_attributes=True). For rows that
+come straight from the database every field already has the declared type,
+so that work only costs time. dump_trusted() reads the declared fields off
+the objects as they are and orjson encodes the result, giving the same JSON
+as model_dump_json().
+
+Only pass rows loaded from the database (ORM objects, RETURNING rows) or
+values the handler built from them; anything that came from a client must
+still go through its schema.
+"""
+import types
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Optional, Union, get_args, get_origin
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+# Same datetime format as pydantic: "Z" for UTC offsets
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _identity(value):
+    return value
+
+
+@lru_cache(maxsize=None)
+def _encoder(annotation) -> Callable[[Any], Any]:
+    """Converter from objects of the annotated type to orjson-ready values"""
+    origin = get_origin(annotation)
+
+    if origin in (Union, types.UnionType):
+        members = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(members) != 1:
+            return _identity
+        encode_member = _encoder(members[0])
+        return lambda value: None if value is None else encode_member(value)
+
+    if origin in (list, tuple, set, frozenset):
+        args = get_args(annotation)
+        encode_item = _encoder(args[0]) if args else _identity
+        if encode_item is _identity:
+            return list
+        return lambda values: [encode_item(value) for value in values]
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        fields = annotation.model_fields
+        keys = [field.alias or name for name, field in fields.items()]
+        encoders = [_encoder(field.annotation) for field in fields.values()]
+        nested = [index for index, encode in enumerate(encoders) if encode is not _identity]
+        names = list(fields)
+        # Loaded ORM columns and pydantic fields live in the instance __dict__,
+        # which is much cheaper to read than instrumented attributes; anything
+        # else (RETURNING rows, unloaded attributes) goes through getattr
+        from_dict = itemgetter(*names) if len(names) > 1 else lambda values: (values[names[0]],)
+        from_attributes = attrgetter(*names) if len(names) > 1 else lambda obj: (getattr(obj, names[0]),)
+
+        def encode_model(obj):
+            try:
+                values = from_dict(obj.__dict__)
+            except (AttributeError, KeyError):
+                values = from_attributes(obj)
+            if nested:
+                values = list(values)
+                for index in nested:
+                    values[index] = encoders[index](values[index])
+            return dict(zip(keys, values))
+
+        return encode_model
+
+    return _identity
+
+
+def dump_trusted(annotation, value) -> Any:
+    """value as plain data shaped by annotation (a model, List[model], ...), unvalidated"""
+    return _encoder(annotation)(value)
+
+
+def dumps(value) -> bytes:
+    """value (plain data) as JSON, encoded like the API's responses"""
+    return orjson.dumps(value, option=ORJSON_OPTIONS)
+
+
+def dumps_trusted(annotation, value) -> bytes:
+    return dumps(dump_trusted(annotation, value))
+
+
+def trusted_response(annotation, value, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """JSON response for value without validating it against annotation"""
+    return Response(
+        content=dumps_trusted(annotation, value),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -0,0 +1,119 @@
+"""Request-scoped SQL statement recording.
+
+Every statement run through an instrumented engine (see
+app.metrics.instrument_engine) is recorded against the request being served:
+statement count, DB time and how often each statement shape repeats. Shapes
+that repeat N_PLUS_ONE_THRESHOLD times or more within one request are logged
+as suspected N+1 queries, and statements slower than SLOW_QUERY_MS are logged
+with their route.
+
+record_queries() and query_budget() collect the statements of every request
+while active; they are meant for tests and scripts such as
+scripts/check_query_budgets.py, not for concurrent traffic.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters in the styles of psycopg2 (%(name)s), asyncpg ($1) and
+# qmark; runs of them (expanded IN lists, VALUES rows) collapse to one "?"
+_PLACEHOLDERS = re.compile(r"(?:\$\d+|%\(\w+\)s|\?)(?:\s*,\s*(?:\$\d+|%\(\w+\)s|\?))*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with parameters collapsed, for grouping repeats"""
+    return _WHITESPACE.sub(" ", _PLACEHOLDERS.sub("?", statement)).strip()
+
+
+class StatementRecorder:
+    """Statements seen by one request (or one record_queries() block)"""
+
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes: Counter = Counter()
+        # record_queries() recorders are fed from the threadpool as well
+        self._lock = threading.Lock()
+
+    def record(self, shape: str, elapsed: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.db_time += elapsed
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Shapes issued at least threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def report_repeats(self) -> int:
+        """Log suspected N+1 patterns; returns how many shapes were flagged"""
+        if settings.n_plus_one_threshold <= 0:
+            return 0
+        repeats = self.repeated(settings.n_plus_one_threshold)
+        for shape, count in repeats:
+            logger.warning("Possible N+1 on %s: statement issued %d times: %s", self.route, count, shape[:500])
+        return len(repeats)
+
+    def summary(self, limit: int = 10) -> str:
+        lines = [f"{count:4d}x {shape[:200]}" for shape, count in self.shapes.most_common(limit)]
+        return "\n".join(lines)
+
+
+# Recorder of the request being served, set by MetricsMiddleware
+current_recorder: ContextVar[Optional[StatementRecorder]] = ContextVar("current_recorder", default=None)
+
+# Recorders opened by record_queries()
+_active_recorders: List[StatementRecorder] = []
+
+
+def record_statement(statement: str, elapsed: float) -> None:
+    """Called by the engine instrumentation after every statement"""
+    shape = statement_shape(statement)
+    recorder = current_recorder.get()
+    if recorder is not None:
+        recorder.record(shape, elapsed)
+    for active in list(_active_recorders):
+        active.record(shape, elapsed)
+
+    if settings.slow_query_ms > 0 and elapsed * 1000 >= settings.slow_query_ms:
+        route = recorder.route if recorder is not None else None
+        logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, shape[:500])
+
+
+@contextmanager
+def record_queries() -> Iterator[StatementRecorder]:
+    """Record every statement issued while the block runs"""
+    recorder = StatementRecorder()
+    _active_recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _active_recorders.remove(recorder)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more statements than its budget"""
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block") -> Iterator[StatementRecorder]:
+    """Fail when the block issues more than max_queries statements.
+
+        with query_budget(3, "GET /v1/lists"):
+            client.get("/v1/lists", headers=headers)
+    """
+    with record_queries() as recorder:
+        yield recorder
+    if recorder.queries > max_queries:
+        raise QueryBudgetExceeded(
+            f"{label} issued {recorder.queries} queries, budget is {max_queries}:\n{recorder.summary()}"
+        )
@@ -0,0 +1,327 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.todo_list import TodoList
+from app.models.task import Task
+from app.models.category import Category
+
+# A suggestion is identified by its kind ("task", "list", "category", "tag") and text
+Suggestion = Tuple[str, str]
+
+# Only the first words of a text are indexed and words are truncated, so one
+# very long title cannot blow up the index
+MAX_WORDS = 8
+MAX_WORD_LENGTH = 32
+
+# Stop collecting candidates under a short prefix once this many were found
+MAX_CANDIDATES = 500
+
+# Rough per-object costs used for the memory budget
+NODE_BYTES = 240
+POSTING_BYTES = 64
+SUGGESTION_BYTES = 200
+
+
+class _Node:
+    __slots__ = ("children", "suggestions")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Suggestions containing the word that ends at this node
+        self.suggestions: Set[Suggestion] = set()
+
+
+def _words(text: str) -> List[str]:
+    return [word[:MAX_WORD_LENGTH] for word in text.lower().split()[:MAX_WORDS]]
+
+
+class PrefixIndex:
+    """Trie over the words of one user's task titles, list names, category names and tags.
+
+    Each distinct word is stored once and points at the suggestions that
+    contain it, so many similar titles share most of the trie. Suggestions
+    are reference counted: the same title on many tasks is stored once and
+    only disappears when its last task does.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.counts: Dict[Suggestion, int] = {}
+        self.node_count = 1
+        self.posting_count = 0
+        self.text_bytes = 0
+        self.lock = threading.Lock()
+
+    @property
+    def estimated_bytes(self) -> int:
+        return (
+            self.node_count * NODE_BYTES
+            + self.posting_count * POSTING_BYTES
+            + len(self.counts) * SUGGESTION_BYTES
+            + self.text_bytes
+        )
+
+    def add(self, suggestion: Suggestion) -> None:
+        with self.lock:
+            count = self.counts.get(suggestion, 0)
+            self.counts[suggestion] = count + 1
+            if count:
+                return
+
+            self.text_bytes += len(suggestion[1])
+            for word in set(_words(suggestion[1])):
+                node = self.root
+                for char in word:
+                    child = node.children.get(char)
+                    if child is None:
+                        child = node.children[char] = _Node()
+                        self.node_count += 1
+                    node = child
+                node.suggestions.add(suggestion)
+                self.posting_count += 1
+
+    def remove(self, suggestion: Suggestion) -> None:
+        with self.lock:
+            count = self.counts.get(suggestion, 0)
+            if count > 1:
+                self.counts[suggestion] = count - 1
+                return
+            self.counts.pop(suggestion, None)
+            if not count:
+                return
+
+            self.text_bytes -= len(suggestion[1])
+            for word in set(_words(suggestion[1])):
+                path = [self.root]
+                for char in word:
+                    node = path[-1].children.get(char)
+                    if node is None:
+                        break
+                    path.append(node)
+                else:
+                    if suggestion in path[-1].suggestions:
+                        path[-1].suggestions.discard(suggestion)
+                        self.posting_count -= 1
+                    # Prune nodes left without suggestions or children
+                    for depth in range(len(word), 0, -1):
+                        node = path[depth]
+                        if node.suggestions or node.children:
+                            break
+                        del path[depth - 1].children[word[depth - 1]]
+                        self.node_count -= 1
+
+    def suggest(self, prefix: str, limit: int) -> List[Suggestion]:
+        """Most frequent suggestions matching every word of prefix.
+
+        The last word may be partial; earlier words must appear as whole words.
+        """
+        words = prefix.lower().split()
+        if not words:
+            return []
+        *complete_words, partial_word = words
+
+        with self.lock:
+            node = self.root
+            for char in partial_word[:MAX_WORD_LENGTH]:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+
+            candidates: Set[Suggestion] = set()
+            stack = [node]
+            while stack and len(candidates) < MAX_CANDIDATES:
+                current = stack.pop()
+                candidates.update(current.suggestions)
+                stack.extend(current.children.values())
+
+            if complete_words:
+                candidates = {
+                    candidate for candidate in candidates
+                    if set(complete_words) <= set(candidate[1].lower().split())
+                }
+
+            phrase = " ".join(words)
+            ranked = sorted(candidates, key=lambda s: (
+                -self.counts.get(s, 0),
+                not s[1].lower().startswith(phrase),
+                len(s[1]),
+                s[1],
+                s[0]
+            ))
+
+        return ranked[:limit]
+
+
+def task_suggestions(task: Task) -> List[Suggestion]:
+    return title_and_tag_suggestions(task.title, task.tags)
+
+
+def title_and_tag_suggestions(title: str, tags: Optional[List[str]]) -> List[Suggestion]:
+    return [("task", title)] + [("tag", tag) for tag in (tags or []) if tag]
+
+
+def list_suggestions(todo_list: TodoList) -> List[Suggestion]:
+    return [("list", todo_list.name)]
+
+
+def category_suggestions(category: Category) -> List[Suggestion]:
+    return [("category", category.name)]
+
+
+async def build_prefix_index(db: AsyncSession, user_id: str) -> PrefixIndex:
+    """Load all suggestion sources for a user into a fresh index.
+
+    Task rows are streamed in batches, so other requests get the event loop
+    between batches while a large account is indexed.
+    """
+    index = PrefixIndex()
+
+    task_rows = await db.stream(
+        select(Task.title, Task.tags)
+        .join(TodoList, Task.list_id == TodoList.id)
+        .where(TodoList.owner_id == user_id)
+        .execution_options(yield_per=1000)
+    )
+    async for batch in task_rows.partitions():
+        for title, tags in batch:
+            index.add(("task", title))
+            for tag in tags or []:
+                if tag:
+                    index.add(("tag", tag))
+
+    for name in await db.scalars(select(TodoList.name).where(TodoList.owner_id == user_id)):
+        index.add(("list", name))
+
+    for name in await db.scalars(select(Category.name).where(Category.user_id == user_id)):
+        index.add(("category", name))
+
+    return index
+
+
+class PrefixIndexRegistry:
+    """Per-user prefix indexes, built lazily and evicted LRU.
+
+    Indexes are dropped when idle for longer than idle_seconds, when older
+    than max_age_seconds (bounding staleness from writes handled by other
+    worker processes), and least-recently-used first once the estimated
+    total size exceeds the memory budget. The total is kept as a running sum
+    of each index's size as last measured, so a write only re-measures the
+    index it changed.
+    """
+
+    def __init__(self, memory_budget_bytes: int, idle_seconds: int, max_age_seconds: int):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+        # user_id -> (index, built_at, last_used_at, counted_bytes), least
+        # recently used first; counted_bytes is the index's share of _total_bytes
+        self._indexes: "OrderedDict[str, Tuple[PrefixIndex, float, float, int]]" = OrderedDict()
+        self._total_bytes = 0
+        # users whose index is being built, and whether a write raced the build
+        self._building: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    async def get(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        builder: Callable[[AsyncSession, str], Awaitable[PrefixIndex]] = build_prefix_index
+    ) -> PrefixIndex:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._indexes.get(user_id)
+            if entry is not None:
+                index, built_at, _, counted_bytes = entry
+                self._indexes[user_id] = (index, built_at, now, counted_bytes)
+                self._indexes.move_to_end(user_id)
+                return index
+            self._building[user_id] = False
+
+        index = await builder(db, user_id)
+
+        with self._lock:
+            # A write committed while we were reading may be missing from this
+            # index; serve it once but do not cache it
+            raced = self._building.pop(user_id, True)
+            if not raced:
+                self._drop(user_id)
+                counted_bytes = index.estimated_bytes
+                self._indexes[user_id] = (index, now, now, counted_bytes)
+                self._total_bytes += counted_bytes
+                self._evict_over_budget()
+
+        return index
+
+    def update(self, user_id: str, removed: Iterable[Suggestion] = (), added: Iterable[Suggestion] = ()) -> None:
+        """Apply a committed write to the user's index, if one is loaded"""
+        with self._lock:
+            if user_id in self._building:
+                self._building[user_id] = True
+            entry = self._indexes.get(user_id)
+        if entry is None:
+            return
+
+        index = entry[0]
+        for suggestion in removed:
+            index.remove(suggestion)
+        for suggestion in added:
+            index.add(suggestion)
+
+        with self._lock:
+            # Re-measure only this index, unless it was evicted meanwhile
+            entry = self._indexes.get(user_id)
+            if entry is None or entry[0] is not index:
+                return
+            index, built_at, last_used_at, counted_bytes = entry
+            measured_bytes = index.estimated_bytes
+            self._indexes[user_id] = (index, built_at, last_used_at, measured_bytes)
+            self._total_bytes += measured_bytes - counted_bytes
+            self._evict_over_budget()
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's index; it is rebuilt on the next suggest call"""
+        with self._lock:
+            if user_id in self._building:
+                self._building[user_id] = True
+            self._drop(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._total_bytes = 0
+
+    @property
+    def estimated_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def _drop(self, user_id: str) -> None:
+        entry = self._indexes.pop(user_id, None)
+        if entry is not None:
+            self._total_bytes -= entry[3]
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [
+            user_id for user_id, (_, built_at, last_used_at, _) in self._indexes.items()
+            if now - last_used_at > self.idle_seconds or now - built_at > self.max_age_seconds
+        ]
+        for user_id in expired:
+            self._drop(user_id)
+
+    def _evict_over_budget(self) -> None:
+        # Always keep the most recently used index, even if it alone is over budget
+        while self._total_bytes > self.memory_budget_bytes and len(self._indexes) > 1:
+            _, (_, _, _, counted_bytes) = self._indexes.popitem(last=False)
+            self._total_bytes -= counted_bytes
+
+
+prefix_indexes = PrefixIndexRegistry(
+    memory_budget_bytes=settings.suggest_memory_budget_mb * 1024 * 1024,
+    idle_seconds=settings.suggest_index_idle_seconds,
+    max_age_seconds=settings.suggest_index_max_age_seconds,
+)
@@ -0,0 +1 @@
+# Operational and benchmarking scripts (run with python -m scripts.<name>)
@@ -0,0 +1,73 @@
+"""Benchmark GET /analytics for a single large account.
+
+Seeds (once) a user with --tasks tasks spread over --lists lists, then calls
+get_user_analytics for every period and reports the number of SQL statements
+per call and the latency distribution.
+
+Usage:
+    python -m scripts.bench_analytics --tasks 100000 --iterations 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from sqlalchemy import event
+from app.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.user import User
+from app.routers.search import get_user_analytics
+from scripts.seed import seed
+
+
+async def run(user: User, iterations: int):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with AsyncSessionLocal() as db:
+        for period in ["week", "month", "year", "all"]:
+            # Warm up caches and the connection before timing
+            await get_user_analytics(period=period, current_user=user, db=db)
+
+            timings = []
+            statements.clear()
+            event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+            try:
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    await get_user_analytics(period=period, current_user=user, db=db)
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+            timings.sort()
+            print(
+                f"period={period:<5} queries/call={len(statements) / iterations:.0f} "
+                f"p50={statistics.median(timings):.1f}ms "
+                f"p95={timings[int(len(timings) * 0.95) - 1]:.1f}ms "
+                f"max={timings[-1]:.1f}ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analytics endpoint")
+    parser.add_argument("--tasks", type=int, default=100_000, help="Tasks for the benchmark user")
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--prefix", default="bench_analytics")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        if user is None:
+            seed(db, users=1, lists_per_user=args.lists, tasks_per_list=args.tasks // args.lists, prefix=args.prefix)
+            user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+    finally:
+        db.close()
+
+    asyncio.run(run(user, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+"""Benchmark every API endpoint and write a machine-readable baseline.
+
+Seeds (once) --users accounts with scripts.seed, then drives the app through
+an in-process ASGI client against the configured database in two phases:
+
+- endpoints: every route in app/routers is called --iterations times in a
+  row. Per-call setup (creating the row a DELETE removes, say) is not timed.
+- load: --users clients send a weighted mix of reads and writes at each
+  --concurrency level.
+
+Each run reports p50/p95/p99 latency, throughput, errors and SQL statements
+per request, and writes them as JSON to --output. Pass an earlier file as
+--compare to print the change per endpoint; with --max-regression the script
+exits non-zero when a p95 grows by more than that percentage.
+
+The response cache and rate limiter are off unless set in the environment, so
+the numbers measure the routers and the database rather than cache hits.
+
+Usage:
+    python -m scripts.bench_api --output baseline.json
+    python -m scripts.bench_api --compare baseline.json --max-regression 20
+    python -m scripts.bench_api --only tasks --iterations 200 --concurrency 10,50
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+import httpx
+
+# Measure the database path of every request; set before app imports
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+
+from sqlalchemy import text
+from app.auth import create_access_token
+from app.config import settings
+from app.database import SessionLocal
+from app.hashing import hashing_pool
+from app.main import app
+from app.models.category import Category
+from app.models.task import Task
+from app.models.todo_list import TodoList
+from app.models.user import User
+from app.sql_recorder import record_queries
+from scripts.seed import SEED_PASSWORD, SeedDistribution, seed
+
+# Tasks created up front in each account's scratch list for the update scenarios
+SCRATCH_TASKS = 20
+
+
+@dataclass
+class Account:
+    """A seeded user and the rows the scenarios read and write"""
+    user_id: str
+    email: str
+    headers: dict
+    list_id: str
+    task_id: str
+    category_id: str
+    # Created by the benchmark and removed afterwards
+    scratch_id: str = ""
+    sink_id: str = ""
+    trash_id: str = ""
+    scratch_category_id: str = ""
+    scratch_task_ids: tuple = ()
+
+    def ids(self) -> dict:
+        return {
+            "list_id": self.list_id, "task_id": self.task_id, "category_id": self.category_id,
+            "scratch_id": self.scratch_id, "sink_id": self.sink_id, "trash_id": self.trash_id,
+            "scratch_category_id": self.scratch_category_id, "scratch_task_id": self.scratch_task_ids[0],
+            "email": self.email,
+        }
+
+
+# Untimed setup run before each call; returns extra ids for the path and body
+Prepare = Callable[[httpx.AsyncClient, Account, dict], Awaitable[dict]]
+
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+    body: object = None
+    # Raw request body (imports); sent instead of body
+    content: Optional[bytes] = None
+    prepare: Optional[Prepare] = None
+    # Share of the load mix; 0 leaves the scenario out of the load phase
+    weight: int = 0
+    # Path that deletes what the call created, formatted with its "id"
+    cleanup: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def fill(value, ids: dict):
+    """Format the id placeholders in a path or JSON body"""
+    if isinstance(value, str):
+        # A lone placeholder for a list of ids stands for the list itself
+        if value.startswith("{") and value.endswith("}") and isinstance(ids.get(value[1:-1]), list):
+            return ids[value[1:-1]]
+        return value.format(**ids)
+    if isinstance(value, list):
+        return [fill(item, ids) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    return value
+
+
+async def created(client: httpx.AsyncClient, method: str, path: str, body) -> dict:
+    response = await client.request(method, path, json=body)
+    response.raise_for_status()
+    return response.json()
+
+
+async def new_list(client, account, ids):
+    return {"new_list_id": (await created(client, "POST", "/v1/lists", {"name": f"bench list {ids['n']}"}))["id"]}
+
+
+async def new_category(client, account, ids):
+    body = {"name": f"bench category {ids['n']}"}
+    return {"new_category_id": (await created(client, "POST", "/v1/categories", body))["id"]}
+
+
+async def new_task(client, account, ids):
+    body = {"title": f"bench task {ids['n']}"}
+    return {"new_task_id": (await created(client, "POST", f"/v1/tasks/{account.trash_id}/tasks", body))["id"]}
+
+
+async def new_tasks(client, account, ids):
+    body = {"list_id": account.trash_id, "tasks": [{"title": f"bench task {n}"} for n in range(SCRATCH_TASKS)]}
+    return {"new_task_ids": [task["id"] for task in await created(client, "POST", "/v1/tasks/bulk", body)]}
+
+
+async def finished_import(client, account, ids):
+    import_id = f"bench-{ids['run']}-{ids['n']}"
+    response = await client.post(
+        "/v1/import/tasks", params={"list_id": account.trash_id, "import_id": import_id}, content=IMPORT_BODY
+    )
+    response.raise_for_status()
+    return {"import_id": import_id}
+
+
+IMPORT_BODY = "".join(
+    json.dumps({"title": f"imported {n}", "priority": "low", "tags": ["import"]}) + "\n" for n in range(100)
+).encode()
+
+SCENARIOS: List[Scenario] = [
+    # auth
+    Scenario("POST", "/v1/auth/register", {
+        "email": "bench_reg_{run}_{n}@example.com", "username": "bench_reg_{run}_{n}", "password": SEED_PASSWORD,
+    }),
+    Scenario("POST", "/v1/auth/login", {"email": "{email}", "password": SEED_PASSWORD}),
+    Scenario("POST", "/v1/auth/refresh"),
+    Scenario("POST", "/v1/auth/logout"),
+    # users
+    Scenario("GET", "/v1/users/me", weight=2),
+    Scenario("PUT", "/v1/users/me", {"first_name": "Bench {n}"}),
+    # lists
+    Scenario("GET", "/v1/lists", weight=10),
+    Scenario("GET", "/v1/lists?search=list", weight=2),
+    Scenario("POST", "/v1/lists", {"name": "bench list {n}"}, weight=1, cleanup="/v1/lists/{id}"),
+    Scenario("GET", "/v1/lists/{list_id}", weight=10),
+    Scenario("PUT", "/v1/lists/{scratch_id}", {"description": "bench {n}"}, weight=1),
+    Scenario("DELETE", "/v1/lists/{new_list_id}", prepare=new_list),
+    # tasks
+    Scenario("GET", "/v1/tasks/{list_id}/tasks", weight=25),
+    Scenario("GET", "/v1/tasks/{list_id}/tasks?completed=false&priority=high&sortBy=dueDate", weight=10),
+    Scenario("GET", "/v1/tasks/{list_id}/tasks?tags_any=work,home", weight=3),
+    Scenario("GET", "/v1/tasks/{list_id}/tasks?facets=priority,category,completed", weight=5),
+    Scenario("POST", "/v1/tasks/{sink_id}/tasks", {"title": "bench task {n}", "priority": "high"}, weight=4),
+    Scenario("GET", "/v1/tasks/{task_id}", weight=10),
+    Scenario("PUT", "/v1/tasks/{scratch_task_id}", {"description": "bench {n}"}, weight=3),
+    Scenario("DELETE", "/v1/tasks/{new_task_id}", prepare=new_task),
+    Scenario("PATCH", "/v1/tasks/{scratch_task_id}/toggle", weight=4),
+    Scenario("POST", "/v1/tasks/bulk", {"list_id": "{sink_id}", "tasks": [{"title": f"bulk {n}"} for n in range(100)]}),
+    Scenario("PATCH", "/v1/tasks/bulk/update", {"task_ids": "{scratch_task_ids}", "updates": {"priority": "medium"}}),
+    Scenario("DELETE", "/v1/tasks/bulk/delete", {"task_ids": "{new_task_ids}"}, prepare=new_tasks),
+    Scenario("PATCH", "/v1/tasks/bulk/update-by-filter", {"filter": {"list_id": "{scratch_id}"}, "updates": {"priority": "low"}}),
+    Scenario("DELETE", "/v1/tasks/bulk/delete-by-filter", {"filter": {"list_id": "{trash_id}"}}, prepare=new_tasks),
+    # categories
+    Scenario("GET", "/v1/categories", weight=5),
+    Scenario("POST", "/v1/categories", {"name": "bench category {n}"}, cleanup="/v1/categories/{id}"),
+    Scenario("GET", "/v1/categories/{category_id}", weight=2),
+    Scenario("PUT", "/v1/categories/{scratch_category_id}", {"color": "#2196F3"}),
+    Scenario("DELETE", "/v1/categories/{new_category_id}", prepare=new_category),
+    # search and analytics
+    Scenario("GET", "/v1/search?q=report", weight=5),
+    Scenario("GET", "/v1/tags", weight=2),
+    Scenario("GET", "/v1/search/suggest?prefix=re", weight=5),
+    Scenario("GET", "/v1/analytics?period=month", weight=2),
+    # export and import
+    Scenario("GET", "/v1/export?format=ndjson"),
+    Scenario("POST", "/v1/import/tasks?list_id={trash_id}&format=ndjson", content=IMPORT_BODY),
+    Scenario("GET", "/v1/import/tasks/{import_id}", prepare=finished_import),
+]
+
+
+def percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)]
+
+
+def summarize(timings: List[float], errors: int, queries: int, elapsed: float) -> dict:
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "mean_ms": round(sum(timings) / len(timings), 2),
+        "p50_ms": round(percentile(timings, 0.5), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+        "p99_ms": round(percentile(timings, 0.99), 2),
+        "queries_per_request": round(queries / len(timings), 2),
+    }
+
+
+class Runner:
+    """Sends scenario requests and tidies up what they created"""
+
+    def __init__(self, run: str):
+        self.run = run
+        self.counter = itertools.count(1)
+        self.created: List[tuple] = []
+
+    async def prepare(self, client, account: Account, scenario: Scenario) -> dict:
+        ids = {**account.ids(), "run": self.run, "n": next(self.counter)}
+        ids["scratch_task_ids"] = list(account.scratch_task_ids)
+        if scenario.prepare is not None:
+            ids.update(await scenario.prepare(client, account, ids))
+        return ids
+
+    async def send(self, client, scenario: Scenario, ids: dict) -> httpx.Response:
+        if scenario.content is not None:
+            return await client.request(scenario.method, fill(scenario.path, ids), content=scenario.content)
+        return await client.request(scenario.method, fill(scenario.path, ids), json=fill(scenario.body, ids))
+
+    def track(self, client, scenario: Scenario, response: httpx.Response) -> None:
+        if scenario.cleanup and response.status_code < 300:
+            self.created.append((client, scenario.cleanup.format(id=response.json()["id"])))
+
+    async def cleanup(self) -> None:
+        for client, path in self.created:
+            await client.delete(path)
+        self.created.clear()
+
+
+async def endpoint_phase(runner: Runner, client, account: Account, scenarios: List[Scenario], iterations: int) -> dict:
+    results = {}
+    for scenario in scenarios:
+        # Warm up connections, caches and the autocomplete index before timing
+        runner.track(client, scenario, await runner.send(client, scenario, await runner.prepare(client, account, scenario)))
+
+        timings, errors, queries, elapsed = [], 0, 0, 0.0
+        for _ in range(iterations):
+            ids = await runner.prepare(client, account, scenario)
+            with record_queries() as recorder:
+                started = time.perf_counter()
+                response = await runner.send(client, scenario, ids)
+                took = time.perf_counter() - started
+            timings.append(took * 1000)
+            elapsed += took
+            queries += recorder.queries
+            errors += response.status_code >= 400
+            runner.track(client, scenario, response)
+        results[scenario.name] = summarize(timings, errors, queries, elapsed)
+        print(f"{scenario.name:<75} {format_result(results[scenario.name])}")
+    return results
+
+
+async def load_phase(runner: Runner, clients: list, accounts: List[Account], scenarios: List[Scenario],
+                     requests: int, concurrency: int) -> dict:
+    mix = [scenario for scenario in scenarios for _ in range(scenario.weight)]
+    queue = asyncio.Queue()
+    for n in range(requests):
+        queue.put_nowait(mix[n % len(mix)])
+    timings, errors = [], 0
+
+    async def worker(number: int):
+        nonlocal errors
+        client, account = clients[number % len(clients)], accounts[number % len(accounts)]
+        while not queue.empty():
+            scenario = queue.get_nowait()
+            ids = await runner.prepare(client, account, scenario)
+            started = time.perf_counter()
+            try:
+                response = await runner.send(client, scenario, ids)
+                errors += response.status_code >= 400
+                runner.track(client, scenario, response)
+            except Exception:
+                # e.g. a pool timeout under heavy concurrency
+                errors += 1
+            timings.append((time.perf_counter() - started) * 1000)
+
+    with record_queries() as recorder:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(number) for number in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(timings, errors, recorder.queries, elapsed)
+
+
+def format_result(result: dict) -> str:
+    return (
+        f"{result['throughput_rps']:8.1f} req/s p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+        f"p99={result['p99_ms']:.1f}ms queries={result['queries_per_request']:g} errors={result['errors']}"
+    )
+
+
+def compare(baseline: dict, current: dict, max_regression: Optional[float]) -> int:
+    """Print p95 and query changes against a baseline; returns the regressions"""
+    regressions = 0
+    rows = [(name, result, baseline.get("endpoints", {}).get(name)) for name, result in current["endpoints"].items()]
+    rows += [(f"load {name}", result, baseline.get("load", {}).get(name)) for name, result in current["load"].items()]
+    print(f"\n{'':<75} {'p95 before':>10} {'after':>8} {'change':>8} {'queries':>12}")
+    for name, result, before in rows:
+        if before is None:
+            print(f"{name:<75} {'-':>10} {result['p95_ms']:>8.1f}")
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        flag = ""
+        if max_regression is not None and change > max_regression:
+            regressions += 1
+            flag = "  REGRESSION"
+        queries = f"{before['queries_per_request']:g} -> {result['queries_per_request']:g}"
+        print(f"{name:<75} {before['p95_ms']:>10.1f} {result['p95_ms']:>8.1f} {change:>+7.0f}% {queries:>12}{flag}")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_accounts(args) -> List[Account]:
+    db = SessionLocal()
+    try:
+        if db.query(User).filter(User.username == f"{args.prefix}_1").first() is None:
+            seed(
+                db,
+                users=args.users,
+                lists_per_user=args.lists_per_user,
+                tasks_per_list=args.tasks_per_list,
+                prefix=args.prefix,
+                distribution=SeedDistribution(max_tags=3, tag_pool_size=30, tag_skew=2),
+                random_seed=0.5,
+            )
+        accounts = []
+        for n in range(1, args.users + 1):
+            user = db.query(User).filter(User.username == f"{args.prefix}_{n}").one()
+            # The seeded list with the most tasks, so every run reads the same rows
+            todo_list = db.query(TodoList).filter(TodoList.owner_id == user.id).order_by(
+                TodoList.task_count.desc(), TodoList.id
+            ).first()
+            accounts.append(Account(
+                user_id=user.id,
+                email=user.email,
+                headers={"Authorization": f"Bearer {create_access_token({'sub': user.id})}"},
+                list_id=todo_list.id,
+                task_id=db.query(Task.id).filter(Task.list_id == todo_list.id).order_by(Task.id).first()[0],
+                category_id=db.query(Category.id).filter(Category.user_id == user.id).order_by(Category.id).first()[0],
+            ))
+        return accounts
+    finally:
+        db.close()
+
+
+async def create_scratch_rows(client, account: Account) -> None:
+    account.scratch_id = (await created(client, "POST", "/v1/lists", {"name": "bench scratch"}))["id"]
+    account.sink_id = (await created(client, "POST", "/v1/lists", {"name": "bench sink"}))["id"]
+    account.trash_id = (await created(client, "POST", "/v1/lists", {"name": "bench trash"}))["id"]
+    account.scratch_category_id = (await created(client, "POST", "/v1/categories", {"name": "bench scratch"}))["id"]
+    tasks = await created(client, "POST", "/v1/tasks/bulk", {
+        "list_id": account.scratch_id, "tasks": [{"title": f"scratch {n}"} for n in range(SCRATCH_TASKS)],
+    })
+    account.scratch_task_ids = tuple(task["id"] for task in tasks)
+
+
+async def drop_scratch_rows(client, account: Account) -> None:
+    for list_id in (account.scratch_id, account.sink_id, account.trash_id):
+        if list_id:
+            await client.delete(f"/v1/lists/{list_id}")
+    if account.scratch_category_id:
+        await client.delete(f"/v1/categories/{account.scratch_category_id}")
+
+
+async def run(args, accounts: List[Account], run_id: str) -> dict:
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or args.only in scenario.path]
+    runner = Runner(run_id)
+    clients = [
+        httpx.AsyncClient(app=app, base_url="http://bench", headers=account.headers, timeout=None)
+        for account in accounts
+    ]
+    results = {"endpoints": {}, "load": {}}
+    try:
+        for client, account in zip(clients, accounts):
+            await create_scratch_rows(client, account)
+
+        if args.iterations:
+            print(f"endpoints ({args.iterations} sequential calls each)")
+            results["endpoints"] = await endpoint_phase(runner, clients[0], accounts[0], scenarios, args.iterations)
+
+        if any(scenario.weight for scenario in scenarios):
+            print(f"\nload ({len(accounts)} users, {args.requests} requests per level)")
+            for concurrency in [int(level) for level in args.concurrency.split(",") if level]:
+                result = await load_phase(runner, clients, accounts, scenarios, args.requests, concurrency)
+                results["load"][f"concurrency={concurrency}"] = result
+                print(f"{f'concurrency={concurrency}':<75} {format_result(result)}")
+    finally:
+        await runner.cleanup()
+        for client, account in zip(clients, accounts):
+            await drop_scratch_rows(client, account)
+            await client.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint")
+    parser.add_argument("--users", type=int, default=10, help="Seeded accounts; load clients cycle through them")
+    parser.add_argument("--lists-per-user", type=int, default=10)
+    parser.add_argument("--tasks-per-list", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=50, help="Sequential calls per endpoint (0 skips)")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per load concurrency level")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated load concurrency levels")
+    parser.add_argument("--only", help="Only scenarios whose path contains this text")
+    parser.add_argument("--prefix", default="bench_api")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    parser.add_argument("--max-regression", type=float, help="Fail when a p95 grows by more than this percent")
+    args = parser.parse_args()
+
+    accounts = load_accounts(args)
+    run_id = uuid.uuid4().hex[:8]
+    try:
+        results = asyncio.run(run(args, accounts, run_id))
+    finally:
+        hashing_pool.shutdown()
+        # Accounts made by the register scenario
+        db = SessionLocal()
+        try:
+            db.execute(text("DELETE FROM users WHERE username LIKE :pattern"), {"pattern": f"bench\\_reg\\_{run_id}\\_%"})
+            db.commit()
+        finally:
+            db.close()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "dataset": {
+                "users": args.users, "lists_per_user": args.lists_per_user, "tasks_per_list": args.tasks_per_list,
+            },
+            "iterations": args.iterations,
+            "requests_per_level": args.requests,
+            "settings": {
+                "response_cache_backend": settings.response_cache_backend,
+                "rate_limit_backend": settings.rate_limit_backend,
+                "database_pool_size": settings.database_pool_size,
+                "database_max_overflow": settings.database_max_overflow,
+                "bcrypt_rounds": settings.bcrypt_rounds,
+            },
+        },
+        **results,
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(json.load(handle), report, args.max_regression)
+        if regressions:
+            print(f"{regressions} result(s) regressed by more than {args.max_regression:g}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Load test the async request path against an equivalent sync one.
+
+Builds a small sync twin of the hot read endpoints (task listing, single
+list, categories) that runs the same queries through the sync Session and a
+threadpool, the way every router worked before the async port. Both apps are
+then driven through an in-process ASGI client at each --concurrency level and
+compared on throughput and latency percentiles.
+
+Usage:
+    python -m scripts.bench_async --requests 2000 --concurrency 10,50,200
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+# One benchmark client goes far past any sensible rate limit; set before app imports
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+
+from app.auth import create_access_token, get_current_user_for_read
+from app.database import SessionLocal, get_db
+from app.main import app as async_app
+from app.models.category import Category
+from app.models.task import Task
+from app.models.todo_list import TodoList
+from app.models.user import User
+from app.pagination import order_by_keyset
+from app.routers.tasks import task_filters
+from app.schemas.category import CategoryResponse
+from app.schemas.task import TaskResponse
+from app.schemas.todo_list import TodoListResponse
+from scripts.seed import seed
+
+sync_app = FastAPI()
+
+
+@sync_app.get("/v1/tasks/{list_id}/tasks", response_model=List[TaskResponse])
+def sync_get_tasks(list_id: str, current_user: User = Depends(get_current_user_for_read), db: Session = Depends(get_db)):
+    if db.scalar(select(TodoList.id).where(TodoList.id == list_id, TodoList.owner_id == current_user.id)) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="List not found")
+    query = order_by_keyset(select(Task).where(*task_filters(list_id)), Task.created_at, Task.id, "desc")
+    db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+    return db.scalars(query.limit(20)).all()
+
+
+@sync_app.get("/v1/lists/{list_id}", response_model=TodoListResponse)
+def sync_get_list(list_id: str, current_user: User = Depends(get_current_user_for_read), db: Session = Depends(get_db)):
+    return db.scalar(select(TodoList).where(TodoList.id == list_id, TodoList.owner_id == current_user.id))
+
+
+@sync_app.get("/v1/categories", response_model=List[CategoryResponse])
+def sync_get_categories(current_user: User = Depends(get_current_user_for_read), db: Session = Depends(get_db)):
+    return db.scalars(select(Category).where(Category.user_id == current_user.id)).all()
+
+
+def percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)]
+
+
+async def drive(app, paths: List[str], headers: dict, requests: int, concurrency: int) -> str:
+    timings, errors = [], 0
+    queue = asyncio.Queue()
+    for n in range(requests):
+        queue.put_nowait(paths[n % len(paths)])
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", headers=headers, timeout=None) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                path = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    errors += response.status_code != 200
+                except Exception:
+                    # e.g. the sync stack timing out on the connection pool
+                    errors += 1
+                timings.append((time.perf_counter() - started) * 1000)
+
+        # Warm up connections and caches before timing
+        for path in paths:
+            await client.get(path)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return (
+        f"{requests / elapsed:8.1f} req/s  p50={percentile(timings, 0.5):.1f}ms "
+        f"p95={percentile(timings, 0.95):.1f}ms p99={percentile(timings, 0.99):.1f}ms errors={errors}"
+    )
+
+
+async def run(args, user_id: str, list_ids: List[str]):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+    paths = [f"/v1/tasks/{list_id}/tasks" for list_id in list_ids]
+    paths += [f"/v1/lists/{list_id}" for list_id in list_ids]
+    paths.append("/v1/categories")
+
+    for concurrency in [int(level) for level in args.concurrency.split(",")]:
+        for name, app in [("sync", sync_app), ("async", async_app)]:
+            print(f"concurrency={concurrency:<4} {name:<5} {await drive(app, paths, headers, args.requests, concurrency)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sync and async request paths")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per stack and concurrency level")
+    parser.add_argument("--concurrency", default="10,50,200", help="Comma-separated concurrency levels")
+    parser.add_argument("--prefix", default="bench_async")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        if user is None:
+            seed(db, users=1, lists_per_user=10, tasks_per_list=200, prefix=args.prefix)
+            user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        list_ids = [list_id for (list_id,) in db.query(TodoList.id).filter(TodoList.owner_id == user.id)]
+        user_id = user.id
+    finally:
+        db.close()
+
+    asyncio.run(run(args, user_id, list_ids))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark POST /auth/login throughput.
+
+Seeds (once) --users accounts, then fires --requests logins with --concurrency
+in flight through an in-process ASGI client. While logins run, a probe keeps
+calling GET /health so the report also shows whether password hashing stalls
+the rest of the application. Compare runs with different BCRYPT_ROUNDS and
+PASSWORD_HASH_WORKERS settings.
+
+Usage:
+    python -m scripts.bench_login --requests 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import time
+import httpx
+
+# One benchmark client goes far past any sensible rate limit; set before app imports
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+
+from app.config import settings
+from app.database import SessionLocal
+from app.hashing import hashing_pool
+from app.main import app
+from app.models.user import User
+from scripts.seed import SEED_PASSWORD, seed
+
+
+def percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)]
+
+
+def summary(timings):
+    timings = sorted(timings)
+    return (
+        f"p50={percentile(timings, 0.5):.1f}ms p95={percentile(timings, 0.95):.1f}ms "
+        f"p99={percentile(timings, 0.99):.1f}ms max={timings[-1]:.1f}ms"
+    )
+
+
+async def run(args):
+    emails = [f"{args.prefix}_{n}@example.com" for n in range(1, args.users + 1)]
+    login_timings, probe_timings, statuses = [], [], {}
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        # Warm up the hashing workers before timing
+        await client.post("/v1/auth/login", json={"email": emails[0], "password": SEED_PASSWORD})
+
+        queue = asyncio.Queue()
+        for n in range(args.requests):
+            queue.put_nowait(emails[n % len(emails)])
+
+        async def login_worker():
+            while not queue.empty():
+                email = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post("/v1/auth/login", json={"email": email, "password": SEED_PASSWORD})
+                login_timings.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_timings.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    print(
+        f"bcrypt_rounds={settings.bcrypt_rounds} workers={settings.password_hash_workers} "
+        f"max_queue={settings.password_hash_max_queue} concurrency={args.concurrency}"
+    )
+    print(f"logins: {args.requests / elapsed:.1f}/s statuses={statuses} {summary(login_timings)}")
+    print(f"health probe while loaded: n={len(probe_timings)} {summary(probe_timings)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the login endpoint")
+    parser.add_argument("--users", type=int, default=50, help="Accounts to log in as")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--prefix", default="bench_login")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if db.query(User).filter(User.username == f"{args.prefix}_1").first() is None:
+            seed(db, users=args.users, lists_per_user=0, tasks_per_list=0, categories_per_user=0, prefix=args.prefix)
+    finally:
+        db.close()
+
+    try:
+        asyncio.run(run(args))
+    finally:
+        hashing_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
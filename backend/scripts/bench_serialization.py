@@ -0,0 +1,107 @@
+"""Microbenchmark response serialization in microseconds per row.
+
+Builds --rows transient Task objects (no database needed) and times each way
+a page of them can be turned into a response body:
+
+- fastapi+json: what FastAPI does for a handler returning the rows with a
+  response_model: validate, jsonable_encoder, then json.dumps (JSONResponse)
+- fastapi+orjson: the same with ORJSONResponse, the app's default class
+- model_validate: model_validate(from_attributes=True).model_dump_json(), the
+  response cache's previous path
+- trusted: dumps_trusted(), which skips validation
+
+Usage:
+    python -m scripts.bench_serialization --rows 20,100,1000 --repeat 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.models.task import Task
+from app.schemas.common import PaginatedResponse, PaginationInfo
+from app.schemas.task import TaskResponse
+from app.serialization import dumps_trusted
+
+PRIORITIES = ["low", "medium", "high", "urgent"]
+
+
+def make_tasks(count: int) -> List[Task]:
+    now = datetime.now(timezone.utc)
+    return [
+        Task(
+            id=str(uuid.uuid4()),
+            title=f"Task {n} report",
+            description="Synthetic task description" if n % 2 else None,
+            priority=PRIORITIES[n % 4],
+            due_date=now + timedelta(days=n % 30) if n % 3 else None,
+            list_id=str(uuid.uuid4()),
+            category_id=str(uuid.uuid4()) if n % 4 else None,
+            tags=["work", "urgent"][: n % 3],
+            is_completed=n % 5 == 0,
+            created_at=now - timedelta(minutes=n),
+            updated_at=now if n % 2 else None,
+            completed_at=now if n % 5 == 0 else None,
+        )
+        for n in range(count)
+    ]
+
+
+def page_of(tasks: List[Task]) -> PaginatedResponse:
+    return PaginatedResponse(
+        data=tasks,
+        pagination=PaginationInfo(page=1, limit=len(tasks), total=len(tasks) * 10, total_pages=10, has_next=True, has_prev=False)
+    )
+
+
+def timed(function, repeat: int) -> float:
+    """Best of repeat runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization per row")
+    parser.add_argument("--rows", default="20,100,1000", help="Comma-separated page sizes")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model = PaginatedResponse[TaskResponse]
+    field = create_response_field(name="bench", type_=model)
+    loop = asyncio.new_event_loop()
+
+    def fastapi_body(response_class):
+        def render(value):
+            content = loop.run_until_complete(serialize_response(field=field, response_content=value))
+            return response_class(content).body
+        return render
+
+    methods = {
+        "fastapi+json": fastapi_body(JSONResponse),
+        "fastapi+orjson": fastapi_body(ORJSONResponse),
+        "model_validate": lambda value: model.model_validate(value, from_attributes=True).model_dump_json().encode(),
+        "trusted": lambda value: dumps_trusted(model, value),
+    }
+
+    print(f"{'rows':>6} " + " ".join(f"{name:>16}" for name in methods) + "   (us/row, best of runs)")
+    for count in [int(rows) for rows in args.rows.split(",")]:
+        value = page_of(make_tasks(count))
+        bodies = {name: method(value) for name, method in methods.items()}
+        # Every path must produce the same document
+        assert len({body.replace(b" ", b"") for name, body in bodies.items() if name != "fastapi+json"}) == 1
+        timings = {name: timed(lambda: method(value), args.repeat) / count * 1e6 for name, method in methods.items()}
+        print(f"{count:>6} " + " ".join(f"{timings[name]:>16.2f}" for name in methods))
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Fail if concurrent writes to the same tasks make list counters drift.
+
+Creates a scratch list, then fires concurrent toggles, updates and duplicate
+deletes at the same tasks through an in-process client. Each request runs in
+its own database session, so they race in Postgres as they would across
+workers. Afterwards task_count and completed_task_count must equal COUNT(*)
+over the list's tasks, and each task must have been deleted exactly once:
+
+    python -m scripts.check_counter_races
+    python -m scripts.check_counter_races --rounds 10 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+import httpx
+
+# Every request takes the database path; set before app imports
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+
+from sqlalchemy import func, select
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.models.todo_list import TodoList
+from app.models.task import Task
+from scripts.seed import seed
+
+
+def counters(list_id: str) -> tuple:
+    """(task_count, completed_task_count, actual total, actual completed)"""
+    db = SessionLocal()
+    try:
+        todo_list = db.get(TodoList, list_id)
+        total, completed = db.execute(
+            select(func.count(), func.count().filter(Task.is_completed == True)).where(Task.list_id == list_id)
+        ).one()
+        return todo_list.task_count, todo_list.completed_task_count, total, completed
+    finally:
+        db.close()
+
+
+async def race(client: httpx.AsyncClient, list_id: str, concurrency: int) -> list:
+    """One round: toggles and updates of two tasks, duplicate deletes of one"""
+    tasks = [
+        (await client.post(f"/v1/tasks/{list_id}/tasks", json={"title": f"race {n}"})).json()["id"]
+        for n in range(2)
+    ]
+    doomed, survivor = tasks
+    requests = []
+    for n in range(concurrency):
+        requests.append(("PATCH", f"/v1/tasks/{doomed}/toggle", None))
+        requests.append(("PUT", f"/v1/tasks/{survivor}", {"is_completed": n % 2 == 0}))
+        if n % 4 == 0:
+            requests.append(("DELETE", f"/v1/tasks/{doomed}", None))
+    responses = await asyncio.gather(*(
+        client.request(method, path, json=body) for method, path, body in requests
+    ))
+    return [(method, response.status_code) for (method, _, _), response in zip(requests, responses)]
+
+
+async def run(user_id: str, rounds: int, concurrency: int) -> int:
+    failures = 0
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+    # A handler that fails is reported as a 500 instead of aborting the round
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://races", headers=headers) as client:
+        scratch = await client.post("/v1/lists", json={"name": "counter race scratch"})
+        list_id = scratch.json()["id"]
+        try:
+            for round_number in range(1, rounds + 1):
+                statuses = await race(client, list_id, concurrency)
+                deletes = Counter(status for method, status in statuses if method == "DELETE")
+                unexpected = Counter(
+                    status for method, status in statuses if status not in (200, 204, 404)
+                )
+                task_count, completed_count, total, completed = counters(list_id)
+                ok = (
+                    (task_count, completed_count) == (total, completed)
+                    and deletes[204] == 1
+                    and not unexpected
+                )
+                failures += 0 if ok else 1
+                print(
+                    f"{'ok' if ok else 'DRIFT':<6} round {round_number}: "
+                    f"task_count={task_count}/{total} completed_task_count={completed_count}/{completed} "
+                    f"deletes={dict(deletes)}{f' unexpected={dict(unexpected)}' if unexpected else ''}"
+                )
+        finally:
+            await client.delete(f"/v1/lists/{list_id}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check list counters under concurrent task writes")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--prefix", default="counter_race")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        if user is None:
+            seed(db, users=1, lists_per_user=1, tasks_per_list=1, prefix=args.prefix)
+            user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        user_id = user.id
+    finally:
+        db.close()
+
+    failures = asyncio.run(run(user_id, args.rounds, args.concurrency))
+    if failures:
+        print(f"{failures} round(s) left counters out of step with the tasks")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Fail if an endpoint issues more SQL statements than its budget.
+
+Seeds (once) a small account, then calls each endpoint through an in-process
+client inside query_budget(). The response cache and rate limiter are turned
+off so every request takes the database path, and the auth cache is warmed
+first so budgets cover the handler itself. A budget that is exceeded, e.g.
+because a per-row query loop slipped into a handler, is reported with the
+repeated statement shapes and the script exits non-zero:
+
+    python -m scripts.check_query_budgets
+    python -m scripts.check_query_budgets --report   # print counts, never fail
+"""
+import argparse
+import asyncio
+import os
+import sys
+from typing import List, Tuple
+import httpx
+
+# Measure the database path of every request; set before app imports
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+
+from app.auth import create_access_token
+from app.database import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.models.todo_list import TodoList
+from app.models.task import Task
+from app.models.category import Category
+from app.sql_recorder import QueryBudgetExceeded, query_budget
+from scripts.seed import seed
+
+# (method, path, JSON body, max statements); paths are formatted with the
+# sample list, task and category ids and the scratch list used for writes
+BUDGETS: List[Tuple[str, str, dict, int]] = [
+    ("GET", "/v1/lists", None, 3),
+    ("GET", "/v1/lists?search=list", None, 3),
+    ("GET", "/v1/lists/{list_id}", None, 2),
+    ("GET", "/v1/tasks/{list_id}/tasks", None, 3),
+    ("GET", "/v1/tasks/{list_id}/tasks?completed=false&priority=high&sortBy=dueDate", None, 3),
+    ("GET", "/v1/tasks/{list_id}/tasks?tags_any=work,home", None, 3),
+    ("GET", "/v1/tasks/{list_id}/tasks?facets=priority,category,completed", None, 3),
+    ("GET", "/v1/tasks/{task_id}", None, 1),
+    ("GET", "/v1/categories", None, 2),
+    ("GET", "/v1/categories/{category_id}", None, 2),
+    ("GET", "/v1/search?q=task", None, 2),
+    ("GET", "/v1/tags", None, 2),
+    ("GET", "/v1/analytics", None, 2),
+    ("GET", "/v1/users/me", None, 0),
+    ("POST", "/v1/tasks/{scratch_id}/tasks", {"title": "budget", "category_id": "{category_id}"}, 6),
+    ("POST", "/v1/tasks/bulk", {"list_id": "{scratch_id}", "tasks": [{"title": f"bulk {n}"} for n in range(200)]}, 4),
+    ("PATCH", "/v1/tasks/bulk/update-by-filter", {"filter": {"list_id": "{scratch_id}"}, "updates": {"priority": "low"}}, 4),
+    ("DELETE", "/v1/tasks/bulk/delete-by-filter", {"filter": {"list_id": "{scratch_id}"}}, 4),
+    ("PUT", "/v1/lists/{scratch_id}", {"name": "budget scratch"}, 5),
+]
+
+
+def fill(value, ids: dict):
+    """Format the id placeholders in a path or JSON body"""
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, list):
+        return [fill(item, ids) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    return value
+
+
+async def run(ids: dict, user_id: str, report: bool) -> int:
+    failures = 0
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+    async with httpx.AsyncClient(app=app, base_url="http://budget", headers=headers) as client:
+        scratch = await client.post("/v1/lists", json={"name": "query budget scratch"})
+        ids["scratch_id"] = scratch.json()["id"]
+        # Warm the auth cache so budgets measure the handlers
+        await client.get("/v1/users/me")
+
+        try:
+            for method, path, body, budget in BUDGETS:
+                label = f"{method} {path}"
+                try:
+                    with query_budget(budget, label) as recorder:
+                        response = await client.request(method, fill(path, ids), json=fill(body, ids))
+                    error = None
+                except QueryBudgetExceeded as exc:
+                    error = str(exc)
+                    failures += 0 if report else 1
+                print(f"{'ok' if error is None else 'OVER BUDGET':<12} {recorder.queries:>3}/{budget:<3} {response.status_code} {label}")
+                if error is not None:
+                    print(error)
+        finally:
+            await client.delete(f"/v1/lists/{ids['scratch_id']}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check per-endpoint SQL statement budgets")
+    parser.add_argument("--report", action="store_true", help="Print statement counts without failing")
+    parser.add_argument("--prefix", default="query_budget")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        if user is None:
+            seed(db, users=1, lists_per_user=3, tasks_per_list=50, prefix=args.prefix)
+            user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        todo_list = db.query(TodoList).filter(TodoList.owner_id == user.id).first()
+        ids = {
+            "list_id": todo_list.id,
+            "task_id": db.query(Task.id).filter(Task.list_id == todo_list.id).first()[0],
+            "category_id": db.query(Category.id).filter(Category.user_id == user.id).first()[0],
+        }
+        user_id = user.id
+    finally:
+        db.close()
+
+    failures = asyncio.run(run(ids, user_id, args.report))
+    if failures:
+        print(f"{failures} endpoint(s) over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
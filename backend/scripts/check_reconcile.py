@@ -0,0 +1,66 @@
+"""Fail if reconcile_task_counts does not repair drifted list counters.
+
+Seeds (once) a small account, corrupts the task_count and
+completed_task_count of its lists with plain SQL, runs the reconciler and
+checks that every list's counters equal COUNT(*) over its tasks again:
+
+    python -m scripts.check_reconcile
+"""
+import argparse
+import sys
+from sqlalchemy import func, select, update
+from app.counters import reconcile_task_counts
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.todo_list import TodoList
+from app.models.task import Task
+from scripts.seed import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that drifted list counters are reconciled")
+    parser.add_argument("--prefix", default="reconcile_check")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        if user is None:
+            seed(db, users=1, lists_per_user=3, tasks_per_list=20, prefix=args.prefix)
+            user = db.query(User).filter(User.username == f"{args.prefix}_1").first()
+        list_ids = db.scalars(select(TodoList.id).where(TodoList.owner_id == user.id)).all()
+
+        # Drift every counter of the account the way a lost update would
+        db.execute(
+            update(TodoList)
+            .where(TodoList.id.in_(list_ids))
+            .values(task_count=TodoList.task_count + 7, completed_task_count=-3)
+        )
+        db.commit()
+
+        fixed = reconcile_task_counts(db)
+
+        failures = 0
+        for list_id in list_ids:
+            todo_list = db.get(TodoList, list_id)
+            db.refresh(todo_list)
+            total, completed = db.execute(
+                select(func.count(), func.count().filter(Task.is_completed == True)).where(Task.list_id == list_id)
+            ).one()
+            ok = (todo_list.task_count, todo_list.completed_task_count) == (total, completed)
+            failures += 0 if ok else 1
+            print(
+                f"{'ok' if ok else 'DRIFT':<6} list {list_id}: "
+                f"task_count={todo_list.task_count}/{total} completed_task_count={todo_list.completed_task_count}/{completed}"
+            )
+    finally:
+        db.close()
+
+    print(f"Reconciled {fixed} lists")
+    if failures or fixed < len(list_ids):
+        print(f"{failures} list(s) still drifted")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Fail if a hot read path falls back to a sequential scan.
+
+Runs the query builders behind the task/list listings, search and analytics
+for a sample seeded user, captures every SELECT they emit and EXPLAINs it.
+Any Seq Scan node on tasks, todo_lists or categories is reported and the
+script exits non-zero. Run it against a seeded database, e.g.:
+
+    python -m scripts.seed --users 1000 --lists-per-user 10 --tasks-per-list 100
+    python -m scripts.explain_check
+"""
+import asyncio
+import json
+import sys
+from contextlib import contextmanager
+from typing import Awaitable, Callable, List, Tuple
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, async_engine
+from app.models.user import User
+from app.models.todo_list import TodoList
+from app.models.task import Task
+from app.routers.lists import get_paginated_lists
+from app.routers.tasks import get_paginated_tasks
+from app.routers.search import search_tasks_and_lists, count_tags, get_user_analytics
+
+# Tables large enough that a sequential scan is always a missing index
+HOT_TABLES = {"tasks", "todo_lists", "categories"}
+
+
+@contextmanager
+def capture_statements(statements: List[Tuple[str, dict]]):
+    """Record every SELECT issued on the engine while the block runs"""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def find_seq_scans(plan: dict) -> List[str]:
+    """Return the hot relations scanned sequentially anywhere in a plan tree"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def explain(db: AsyncSession, statement: str, parameters) -> dict:
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def build_scenarios(db: AsyncSession, user: User, list_id: str) -> List[Tuple[str, Callable[[], Awaitable]]]:
+    scenarios = [
+        ("GET /lists", lambda: get_paginated_lists(db, user.id, 1, 20, None)),
+        ("GET /lists?search", lambda: get_paginated_lists(db, user.id, 1, 20, "List 1")),
+        ("GET /tasks/{list_id}/tasks?completed", lambda: get_paginated_tasks(
+            db, list_id, 1, 20, False, None, None, None, "createdAt", "desc"
+        )),
+        ("GET /tasks/{list_id}/tasks?priority", lambda: get_paginated_tasks(
+            db, list_id, 1, 20, None, "high", None, None, "dueDate", "asc"
+        )),
+        ("GET /search", lambda: search_tasks_and_lists(
+            q="report", type="all", page=1, limit=20, tags=None, tags_any=None, current_user=user, db=db
+        )),
+        ("GET /search?tags_any", lambda: search_tasks_and_lists(
+            q="report", type="all", page=1, limit=20, tags=None, tags_any="work,home", current_user=user, db=db
+        )),
+        ("GET /tasks/{list_id}/tasks?tags", lambda: get_paginated_tasks(
+            db, list_id, 1, 20, None, None, None, None, "createdAt", "desc", None, None, ["work"]
+        )),
+        ("GET /tasks/{list_id}/tasks?tags_any", lambda: get_paginated_tasks(
+            db, list_id, 1, 20, None, None, None, None, "createdAt", "desc", None, None, None, ["work", "home"]
+        )),
+        ("GET /tasks/{list_id}/tasks?facets", lambda: get_paginated_tasks(
+            db, list_id, 1, 20, None, None, None, None, "createdAt", "desc", None, None, None, None,
+            ("completed", "priority", "category")
+        )),
+        ("GET /tags", lambda: count_tags(db, user.id, None, 100)),
+        ("GET /tags?list_id", lambda: count_tags(db, user.id, list_id, 100)),
+    ]
+    for sort_by in ["createdAt", "updatedAt", "dueDate", "priority", "title"]:
+        scenarios.append((f"GET /tasks/{{list_id}}/tasks?sort_by={sort_by}", lambda sort_by=sort_by: get_paginated_tasks(
+            db, list_id, 1, 20, None, None, None, None, sort_by, "desc"
+        )))
+    # Keyset mode: seek from the cursor issued with the first page
+    first_task_page = await get_paginated_tasks(db, list_id, 1, 20, None, None, None, None, "dueDate", "desc")
+    if first_task_page.pagination.next_cursor:
+        scenarios.append(("GET /tasks/{list_id}/tasks?cursor", lambda: get_paginated_tasks(
+            db, list_id, 1, 20, None, None, None, None, "dueDate", "desc",
+            first_task_page.pagination.next_cursor
+        )))
+    first_list_page = await get_paginated_lists(db, user.id, 1, 5, None)
+    if first_list_page.pagination.next_cursor:
+        scenarios.append(("GET /lists?cursor", lambda: get_paginated_lists(
+            db, user.id, 1, 5, None, first_list_page.pagination.next_cursor
+        )))
+    for period in ["week", "month", "year", "all"]:
+        scenarios.append((f"GET /analytics?period={period}", lambda period=period: get_user_analytics(
+            period=period, current_user=user, db=db
+        )))
+    return scenarios
+
+
+async def check() -> int:
+    async with AsyncSessionLocal() as db:
+        sample = await db.scalar(select(TodoList).join(Task, Task.list_id == TodoList.id).limit(1))
+        if sample is None:
+            print("No tasks found; seed the database first (python -m scripts.seed)")
+            return 1
+        user = await db.get(User, sample.owner_id)
+        task_total = await db.scalar(select(func.count(Task.id)))
+        print(f"Checking plans for user {user.id} ({task_total} tasks in database)")
+
+        failures = 0
+        for name, run in await build_scenarios(db, user, sample.id):
+            statements: List[Tuple[str, dict]] = []
+            with capture_statements(statements):
+                await run()
+            scenario_failed = False
+            for statement, parameters in statements:
+                seq_scans = find_seq_scans(await explain(db, statement, parameters))
+                if seq_scans:
+                    scenario_failed = True
+                    print(f"FAIL {name}: sequential scan on {', '.join(sorted(set(seq_scans)))}")
+                    print(f"     {' '.join(statement.split())}")
+            if scenario_failed:
+                failures += 1
+            else:
+                print(f"ok   {name} ({len(statements)} statements)")
+
+    return 1 if failures else 0
+
+
+def main() -> int:
+    return asyncio.run(check())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
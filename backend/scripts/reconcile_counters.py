@@ -0,0 +1,34 @@
+"""Recompute drifted task_count / completed_task_count columns on todo_lists.
+
+The counters are maintained by the task write paths; this is the safety net
+for rows written outside the API (manual SQL, restores, imports). Lists are
+processed in id order, one committed batch at a time, so it can run against
+a live database.
+
+Usage:
+    python -m scripts.reconcile_counters --batch-size 1000
+"""
+import argparse
+import time
+from app.counters import reconcile_task_counts
+from app.database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile denormalized task counters")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Lists per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        fixed = reconcile_task_counts(db, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    print(f"Reconciled {fixed} lists in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
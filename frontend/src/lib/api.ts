@@ -87,7 +87,10 @@ class ApiClient {
     limit?: number
     search?: string
   }): Promise<PaginatedResponse<TodoList>> {
-    const response = await this.client.get<PaginatedResponse<TodoList>>('/lists', { params })
+    // Listings leave out description unless asked for; ListCard shows it
+    const response = await this.client.get<PaginatedResponse<TodoList>>('/lists', {
+      params: { fields: '*', ...params },
+    })
     return response.data
   }
 
@@ -121,7 +124,10 @@ class ApiClient {
     sortBy?: string
     sortOrder?: 'asc' | 'desc'
   }): Promise<PaginatedResponse<Task>> {
-    const response = await this.client.get<PaginatedResponse<Task>>(`/lists/${listId}/tasks`, { params })
+    // Listings leave out description and tags unless asked for; TaskItem shows both
+    const response = await this.client.get<PaginatedResponse<Task>>(`/lists/${listId}/tasks`, {
+      params: { fields: '*', ...params },
+    })
     return response.data
   }
 